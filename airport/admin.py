@@ -7,9 +7,11 @@ from .models import (
     Country,
     Crew,
     Flight,
+    IdempotencyKey,
     Location,
     Order,
     Route,
+    SeatHold,
     Ticket,
 )
 
@@ -33,3 +35,5 @@ admin.site.register(Airport)
 admin.site.register(Route)
 admin.site.register(Flight)
 admin.site.register(Ticket)
+admin.site.register(SeatHold)
+admin.site.register(IdempotencyKey)
@@ -1,6 +1,30 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class AirportConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "airport"
+
+    def ready(self):
+        from airport.cache import bump_generation
+        from airport.itineraries import invalidate_route_graph
+
+        for model_name in ("Location", "Airport", "Route"):
+            model = self.get_model(model_name)
+            post_save.connect(invalidate_route_graph, sender=model)
+            post_delete.connect(invalidate_route_graph, sender=model)
+
+        for model_name in (
+            "AirplaneType",
+            "Airplane",
+            "Crew",
+            "Flight",
+            "Country",
+            "Location",
+            "Airport",
+            "Route",
+        ):
+            model = self.get_model(model_name)
+            post_save.connect(bump_generation, sender=model)
+            post_delete.connect(bump_generation, sender=model)
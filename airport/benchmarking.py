@@ -0,0 +1,108 @@
+"""
+Harness of the benchmark_* commands: requests are served by the WSGI
+handler of the project from several threads, so database connections,
+caches and thread pools behave as under a threaded WSGI server, and a
+command can be run again in subprocesses to compare settings read from
+the environment.
+"""
+import io
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Sequence, TypeVar
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.views import APIView
+
+Item = TypeVar("Item")
+
+
+class WSGIClient:
+    """
+    Send requests to the WSGI handler from any thread and return their
+    status codes. Throttles are turned off for the whole process, they
+    would reject most of the benchmark requests.
+    """
+
+    def __init__(self, **environ):
+        self.environ = {"HTTP_HOST": "localhost", **environ}
+        setup_testing_defaults(self.environ)
+        # Give back the connection of the main thread like a request would.
+        connection.close()
+        APIView.throttle_classes = ()
+        self.handler = WSGIHandler()
+
+    def request(self, body: bytes = b"", **environ) -> int:
+        statuses = []
+        response = self.handler(
+            {
+                **self.environ,
+                **environ,
+                "CONTENT_LENGTH": str(len(body)),
+                "wsgi.input": io.BytesIO(body),
+            },
+            lambda status, headers: statuses.append(int(status[:3])),
+        )
+        try:
+            b"".join(response)
+        finally:
+            # Sends request_finished, which closes or releases
+            # the connection of this thread.
+            response.close()
+        return statuses[0]
+
+
+def run_threads(
+        function: Callable[[Item], int],
+        items: Sequence[Item],
+        threads: int,
+        warm_up: Iterable[Item] = (),
+) -> tuple[list[int], float]:
+    """
+    Call `function` with every item from `threads` threads, after the
+    `warm_up` items. Return the results and the seconds they took.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(function, warm_up))
+
+        start = time.perf_counter()
+        results = list(executor.map(function, items))
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def compare_environments(
+        command: BaseCommand,
+        arguments: list[str],
+        environments: Iterable[tuple[str, dict]],
+) -> None:
+    """
+    Run `command` with `arguments` in a subprocess per (label,
+    environment) and write what each run prints.
+    """
+    name = type(command).__module__.rsplit(".", 1)[-1]
+    for label, environment in environments:
+        result = subprocess.run(
+            [sys.executable, "-m", "django", name, *arguments],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **environment},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            command.stdout.write(
+                command.style.ERROR(
+                    "{label} failed:\n{error}".format(
+                        label=label,
+                        error=result.stderr,
+                    )
+                )
+            )
+        else:
+            command.stdout.write(result.stdout.strip())
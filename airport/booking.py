@@ -0,0 +1,155 @@
+"""
+Booking of tickets by concurrent buyers.
+
+Seats are not rows until they are sold, so there is nothing to lock per
+seat: a booking locks the rows of its flights (SELECT ... FOR UPDATE, in
+id order so two orders never wait for each other), then checks and writes
+its seats. Bookings of the same flight run one after the other, the loser
+of a race sees the winner's tickets and gets a 409 listing the taken seats
+instead of an IntegrityError. Bookings of other flights are not blocked.
+
+Seat holds are taken the same way, and a seat held by another user is
+taken for bookings and holds until the hold expires.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, ErrorDetail
+
+from airport.metrics import (
+    ORDER_CREATE_SECONDS,
+    ORDERS_CREATED,
+    SEAT_CONFLICTS,
+    TICKETS_SOLD,
+)
+from airport.models import Flight, Order, SeatHold, Ticket
+
+
+class SeatConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("Some of the requested seats are already taken.")
+    default_code = "seat_conflict"
+
+    def __init__(self, seats: list[tuple]):
+        # Passed on so the exception can be pickled and copied.
+        super().__init__(seats)
+        # Returned as is by the exception handler.
+        self.detail = {
+            "detail": ErrorDetail(self.default_detail, self.default_code),
+            "seats": [
+                {"flight": flight_id, "row": row, "seat": seat}
+                for flight_id, row, seat in seats
+            ],
+        }
+
+
+def lock_flights(flight_ids) -> None:
+    """Lock the rows of the flights until the end of the transaction."""
+    connection = connections[router.db_for_write(Flight)]
+    if not connection.features.has_select_for_update:
+        # Ex. SQLite, where a writing transaction locks the whole database.
+        return
+    list(
+        Flight.objects.select_for_update()
+        .filter(id__in=flight_ids)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+def release_holds(flight_ids, user_id) -> None:
+    """Delete the holds of the user and the expired ones on the flights."""
+    SeatHold.objects.filter(flight_id__in=flight_ids).filter(
+        Q(user_id=user_id) | Q(expires_at__lte=timezone.now())
+    ).delete()
+
+
+def book_tickets(
+        tickets_data: list[dict],
+        user_id,
+        **order_fields,
+) -> Order:
+    """
+    Create an order with a ticket per item of `tickets_data`,
+    or raise SeatConflict when any of the seats is sold or held by
+    another user. The holds of the user on the flights are released.
+    """
+    requested = [
+        (ticket["flight"].id, ticket["row"], ticket["seat"])
+        for ticket in tickets_data
+    ]
+    flight_ids = {flight_id for flight_id, _, _ in requested}
+    try:
+        with ORDER_CREATE_SECONDS.time(), transaction.atomic():
+            lock_flights(flight_ids)
+            taken = Ticket.taken_seats(requested, user_id)
+            if taken:
+                SEAT_CONFLICTS.inc(stage="lock")
+                raise SeatConflict(taken) from None
+
+            release_holds(flight_ids, user_id)
+            order = Order.objects.create(user_id=user_id, **order_fields)
+            Ticket.objects.bulk_create(
+                Ticket(order=order, **ticket_data)
+                for ticket_data in tickets_data
+            )
+            Flight.update_tickets_sold(
+                [flight_id for flight_id, _, _ in requested]
+            )
+    except IntegrityError:
+        # A ticket written without the lock, ex. from the admin.
+        taken = Ticket.taken_seats(requested, user_id)
+        if not taken:
+            raise
+        SEAT_CONFLICTS.inc(stage="commit")
+        raise SeatConflict(taken) from None
+
+    ORDERS_CREATED.inc()
+    TICKETS_SOLD.inc(len(tickets_data))
+    return order
+
+
+def hold_seats(flight: Flight, seats: list[tuple], user_id) -> datetime:
+    """
+    Hold the (row, seat) `seats` of the flight for the user during
+    AIRPORT_SEAT_HOLD_SECONDS, in place of their previous holds on it,
+    or raise SeatConflict when any of them is sold or held by another
+    user. Return the end of the hold.
+    """
+    requested = [(flight.id, row, seat) for row, seat in seats]
+    expires_at = timezone.now() + timedelta(
+        seconds=settings.AIRPORT_SEAT_HOLD_SECONDS
+    )
+    try:
+        with transaction.atomic():
+            lock_flights([flight.id])
+            taken = Ticket.taken_seats(requested, user_id)
+            if taken:
+                SEAT_CONFLICTS.inc(stage="hold")
+                raise SeatConflict(taken) from None
+
+            release_holds([flight.id], user_id)
+            SeatHold.objects.bulk_create(
+                SeatHold(
+                    flight=flight,
+                    row=row,
+                    seat=seat,
+                    user_id=user_id,
+                    expires_at=expires_at,
+                )
+                for _, row, seat in requested
+            )
+            Flight.touch([flight.id])
+    except IntegrityError:
+        # Held by a concurrent request on a backend without row locks.
+        taken = Ticket.taken_seats(requested, user_id)
+        if not taken:
+            raise
+        SEAT_CONFLICTS.inc(stage="hold")
+        raise SeatConflict(taken) from None
+    return expires_at
@@ -0,0 +1,160 @@
+import hashlib
+import time
+from contextlib import nullcontext
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def get_cache():
+    return caches[settings.AIRPORT_CACHE_ALIAS]
+
+
+def generation_key(model) -> str:
+    return f"airport:generation:{model._meta.label_lower}"
+
+
+def get_generations(models) -> list[int]:
+    """
+    Return the current generation of every model: the time (in ns)
+    of its last write. A missing generation (never bumped or evicted)
+    starts from the current time, so it can not collide with a generation
+    used by an older cache entry.
+    """
+    cache = get_cache()
+    keys = [generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def _bump_generation(model) -> None:
+    cache = get_cache()
+    generation = cache.get(generation_key(model), 0)
+    cache.set(
+        generation_key(model),
+        max(time.time_ns(), generation + 1),
+        None,
+    )
+
+
+def bump_generation(sender, **kwargs) -> None:
+    """post_save/post_delete handler invalidating every cached response
+    built from `sender` rows."""
+    _bump_generation(sender)
+    # Until the transaction commits, readers still see the old rows
+    # and may cache them under the new generation, so bump it once more.
+    transaction.on_commit(lambda: _bump_generation(sender))
+
+
+def _url_digest(request, *parts) -> str:
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f"{request.get_host()}{request.path}?{query}"
+    return hashlib.md5(
+        "|".join([url, *map(str, parts)]).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+
+
+class FreshReadsMixin:
+    def fresh_reads(self, written_at: float):
+        """
+        Context manager for building a response from rows last written
+        at `written_at` (a timestamp), overridden to avoid reading them
+        from a lagging database.
+        """
+        return nullcontext()
+
+
+class CachedResponseMixin(FreshReadsMixin):
+    """
+    Read-through cache for list and retrieve responses.
+    Entries are keyed on the request URL (query params sorted) and on
+    the generations of `cache_models`, so a write to any of these models
+    makes all related entries unreachable without deleting them.
+    """
+
+    cache_models = ()
+
+    def _cache_key(self, request, generations) -> str:
+        digest = _url_digest(request, *generations)
+        return f"airport:response:{digest}"
+
+    def _cached_response(self, view, request, *args, **kwargs):
+        cache = get_cache()
+        generations = get_generations(self.cache_models)
+        key = self._cache_key(request, generations)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
+        with self.fresh_reads(max(generations, default=0) / 10 ** 9):
+            response = view(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.AIRPORT_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin(FreshReadsMixin):
+    """
+    Weak ETag and Last-Modified for list and retrieve responses.
+    By default both come from the generations of `etag_models`, so a
+    request with a matching If-None-Match header gets 304 Not Modified
+    without touching the database or the serializer. If-Modified-Since
+    is not answered: two writes in the same second share a Last-Modified.
+    """
+
+    etag_models = ()
+
+    def get_validators(self, request, *args, **kwargs):
+        """Return (etag, last_modified timestamp) or None to skip."""
+        generations = get_generations(self.etag_models)
+        return (
+            "W/" + quote_etag(_url_digest(request, *generations)),
+            max(generations) / 10 ** 9,
+        )
+
+    def _conditional_response(self, view, request, *args, **kwargs):
+        validators = self.get_validators(request, *args, **kwargs)
+        if validators is None:
+            return view(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=quote_etag(etag))
+        if response is None:
+            with self.fresh_reads(last_modified):
+                response = view(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            response["ETag"] = quote_etag(etag)
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,101 @@
+"""
+Streaming exports of orders and their tickets, one line per ticket.
+
+Rows are read with QuerySet.iterator(), a server-side cursor on
+PostgreSQL, as tuples of the exported columns only, and written to the
+response `chunk_size` rows at a time while the client downloads, so
+memory does not grow with the number of orders exported.
+"""
+import csv
+import json
+from typing import Iterable, Iterator, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from airport.models import Order
+
+FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+# Exported column -> Order lookup. Orders without tickets get one line
+# with empty ticket columns.
+COLUMNS = {
+    "order_id": "id",
+    "created_at": "created_at",
+    "user_id": "user_id",
+    "user_email": "user__email",
+    "ticket_id": "tickets__id",
+    "flight_id": "tickets__flight_id",
+    "departure_time": "tickets__flight__departure_time",
+    "origin": "tickets__flight__route__origin__name",
+    "destination": "tickets__flight__route__destination__name",
+    "row": "tickets__row",
+    "seat": "tickets__seat",
+}
+
+
+def order_rows(
+        queryset: Optional[QuerySet] = None,
+        *,
+        created_after=None,
+        created_before=None,
+        chunk_size: int = 2000,
+) -> Iterator[tuple]:
+    """Values of COLUMNS for the orders created in [after, before)."""
+    if queryset is None:
+        queryset = Order.objects.all()
+    if created_after is not None:
+        queryset = queryset.filter(created_at__gte=created_after)
+    if created_before is not None:
+        queryset = queryset.filter(created_at__lt=created_before)
+    return (
+        queryset
+        .order_by("created_at", "id", "tickets__id")
+        .values_list(*COLUMNS.values())
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _csv_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in row
+        )
+
+
+def _jsonl_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(
+            dict(zip(COLUMNS, row, strict=True)),
+            cls=DjangoJSONEncoder,
+        ) + "\n"
+
+
+def export_lines(
+        rows: Iterable[tuple],
+        file_format: str,
+        chunk_size: int = 2000,
+) -> Iterator[bytes]:
+    """Encoded lines of `rows`, joined in blocks of `chunk_size` rows."""
+    lines = _csv_lines(rows) if file_format == "csv" else _jsonl_lines(rows)
+    block = []
+    for line in lines:
+        block.append(line)
+        if len(block) >= chunk_size:
+            yield "".join(block).encode()
+            block = []
+    if block:
+        yield "".join(block).encode()
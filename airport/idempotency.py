@@ -0,0 +1,100 @@
+"""
+Idempotency-Key support for create actions.
+
+The key is claimed by inserting an IdempotencyKey row in the transaction
+that creates the object, and the response is saved in that row before
+commit. A retry with the same key waits on the unique constraint while
+the first request runs, then replays its response without running the
+view again. A request that fails rolls back its claim, so it can be
+retried. Keys expire after AIRPORT_IDEMPOTENCY_KEY_SECONDS.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from airport.metrics import IDEMPOTENT_REPLAYS
+from airport.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = _(
+        "This Idempotency-Key was already used for another request."
+    )
+    default_code = "idempotency_key_reused"
+
+
+def request_digest(request) -> str:
+    return hashlib.sha256(
+        json.dumps(
+            request.data,
+            sort_keys=True,
+            cls=DjangoJSONEncoder,
+        ).encode()
+    ).hexdigest()
+
+
+def expired_before():
+    return timezone.now() - timedelta(
+        seconds=settings.AIRPORT_IDEMPOTENCY_KEY_SECONDS
+    )
+
+
+class IdempotentCreateMixin:
+    """
+    Replay the first successful response of `create` to the requests of
+    the same user with the same Idempotency-Key header and body.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return super().create(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            raise ValidationError(
+                {HEADER: f"Use at most {MAX_KEY_LENGTH} characters."}
+            )
+
+        digest = request_digest(request)
+        keys = IdempotencyKey.objects.filter(user_id=request.user.pk)
+        with transaction.atomic():
+            # Expired keys of the user, this one included, are free again.
+            keys.filter(created_at__lte=expired_before()).delete()
+            try:
+                with transaction.atomic():
+                    claim = IdempotencyKey.objects.create(
+                        user_id=request.user.pk,
+                        key=key,
+                        request_digest=digest,
+                    )
+            except IntegrityError:
+                return self._replay(keys.get(key=key), digest)
+
+            response = super().create(request, *args, **kwargs)
+            claim.status_code = response.status_code
+            claim.response = response.data
+            claim.save(update_fields=["status_code", "response"])
+        return response
+
+    @staticmethod
+    def _replay(claim: IdempotencyKey, digest: str) -> Response:
+        if claim.request_digest != digest:
+            raise IdempotencyKeyReused()
+        IDEMPOTENT_REPLAYS.inc()
+        return Response(
+            claim.response,
+            status=claim.status_code,
+            headers={"Idempotent-Replayed": "true"},
+        )
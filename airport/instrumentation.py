@@ -0,0 +1,225 @@
+import functools
+import json
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+logger = logging.getLogger("airport.requests")
+
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class RequestTimings:
+    """Counters of one request, in seconds."""
+
+    __slots__ = ("queries", "db", "serializer", "in_serializer", "total")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.in_serializer = False
+        self.total = 0.0
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries", '
+            f"serializer;dur={self.serializer * 1000:.1f}, "
+            f"total;dur={self.total * 1000:.1f}"
+        )
+
+
+_current_timings = ContextVar("airport_request_timings", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += perf_counter() - start
+
+
+def _timed_serializer(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        timings = _current_timings.get()
+        # Nested serializers are part of the outermost one.
+        if timings is None or timings.in_serializer:
+            return method(self, *args, **kwargs)
+
+        timings.in_serializer = True
+        start = perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            timings.serializer += perf_counter() - start
+            timings.in_serializer = False
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+def instrument_serializers() -> None:
+    """
+    Time validation and representation of every DRF serializer. Installed
+    by the middleware, so nothing is patched while instrumentation is off.
+    """
+    if getattr(BaseSerializer.is_valid, "instrumented", False):
+        return
+    for serializer_class in (BaseSerializer, ListSerializer):
+        serializer_class.is_valid = _timed_serializer(
+            serializer_class.is_valid
+        )
+    BaseSerializer.data = property(_timed_serializer(BaseSerializer.data.fget))
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self) -> dict:
+        """Cumulative bucket counts, keyed on their upper bound."""
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(
+                (*self.buckets, "+Inf"),
+                self.counts,
+                strict=True,
+        ):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "buckets": buckets,
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.total_ms = Histogram(DURATION_BUCKETS_MS)
+        self.db_ms = Histogram(DURATION_BUCKETS_MS)
+        self.serializer_ms = Histogram(DURATION_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+
+    def observe(self, timings: RequestTimings) -> None:
+        self.total_ms.observe(timings.total * 1000)
+        self.db_ms.observe(timings.db * 1000)
+        self.serializer_ms.observe(timings.serializer * 1000)
+        self.queries.observe(timings.queries)
+
+    def as_dict(self) -> dict:
+        return {
+            "total_ms": self.total_ms.as_dict(),
+            "db_ms": self.db_ms.as_dict(),
+            "serializer_ms": self.serializer_ms.as_dict(),
+            "queries": self.queries.as_dict(),
+        }
+
+
+class MetricsRegistry:
+    """Per-process histograms keyed on "<method> <view name>"."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view: str, timings: RequestTimings) -> None:
+        with self._lock:
+            if view not in self._views:
+                self._views[view] = ViewMetrics()
+            self._views[view].observe(timings)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                view: metrics.as_dict()
+                for view, metrics in sorted(self._views.items())
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
+
+
+def view_name(request) -> str:
+    match = request.resolver_match
+    return "{method} {view}".format(
+        method=request.method,
+        view=match.view_name if match else "<unresolved>",
+    )
+
+
+class InstrumentationMiddleware:
+    """
+    Record query count, DB time, serializer time and total time of every
+    request. They are sent back in the Server-Timing header, logged as one
+    JSON line on the "airport.requests" logger and aggregated per view in
+    `registry`. Django drops the middleware when AIRPORT_INSTRUMENTATION
+    is off, so it costs nothing then.
+    """
+
+    def __init__(self, get_response):
+        if not settings.AIRPORT_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        instrument_serializers()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(_record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        timings.total = perf_counter() - start
+
+        view = view_name(request)
+        response["Server-Timing"] = timings.server_timing()
+        registry.observe(view, timings)
+        logger.info(
+            json.dumps(
+                {
+                    "view": view,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "queries": timings.queries,
+                    "db_ms": round(timings.db * 1000, 3),
+                    "serializer_ms": round(timings.serializer * 1000, 3),
+                    "total_ms": round(timings.total * 1000, 3),
+                }
+            )
+        )
+        return response
@@ -0,0 +1,208 @@
+import datetime
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from typing import NamedTuple
+
+from airport.models import Airport, Flight, Route
+
+ROUTE_GRAPH_TTL = 300
+
+_route_graph = None
+_route_graph_built_at = 0.0
+
+
+class Leg(NamedTuple):
+    flight_id: int
+    route_id: int
+    origin_id: int
+    destination_id: int
+    origin: str
+    destination: str
+    distance: int
+    departure_time: datetime.datetime
+    arrival_time: datetime.datetime
+
+
+class Itinerary:
+    def __init__(self, legs: list[Leg]):
+        self.legs = legs
+
+    @property
+    def departure_time(self) -> datetime.datetime:
+        return self.legs[0].departure_time
+
+    @property
+    def arrival_time(self) -> datetime.datetime:
+        return self.legs[-1].arrival_time
+
+    @property
+    def distance(self) -> int:
+        return sum(leg.distance for leg in self.legs)
+
+
+class RouteGraph:
+    """
+    Airports as nodes and routes as edges weighted by distance.
+    The graph is small (one tuple per route) and kept in memory,
+    flights are loaded per search for the requested window only.
+    """
+
+    def __init__(self):
+        self.airports = {
+            airport_id: f"{name} ({city})"
+            for airport_id, name, city in Airport.objects.order_by()
+            .values_list("id", "name", "location__city")
+        }
+        self.routes = {}
+        self.outgoing = defaultdict(list)
+        self.incoming = defaultdict(list)
+        for route_id, origin_id, destination_id, distance in (
+            Route.objects.order_by()
+            .values_list("id", "origin_id", "destination_id", "distance")
+        ):
+            self.routes[route_id] = (origin_id, destination_id, distance)
+            self.outgoing[origin_id].append(destination_id)
+            self.incoming[destination_id].append(origin_id)
+
+    @staticmethod
+    def _hops(start_ids: set[int], edges: dict, max_hops: int) -> dict:
+        hops = {airport_id: 0 for airport_id in start_ids}
+        queue = deque(start_ids)
+        while queue:
+            airport_id = queue.popleft()
+            if hops[airport_id] == max_hops:
+                continue
+            for next_id in edges.get(airport_id, ()):
+                if next_id not in hops:
+                    hops[next_id] = hops[airport_id] + 1
+                    queue.append(next_id)
+        return hops
+
+    def search(
+            self,
+            origin_ids: set[int],
+            destination_ids: set[int],
+            day_start: datetime.datetime,
+            max_legs: int,
+            min_connection: datetime.timedelta,
+            max_connection: datetime.timedelta,
+            limit: int,
+    ) -> list[Itinerary]:
+        """
+        Find itineraries of up to `max_legs` flights whose first flight
+        departs on the day starting at `day_start`.
+        Only routes lying on some path of at most `max_legs` hops between
+        the origin and the destination are loaded from the database.
+        """
+        hops_from_origin = self._hops(origin_ids, self.outgoing, max_legs)
+        hops_to_destination = self._hops(
+            destination_ids, self.incoming, max_legs
+        )
+        route_ids = [
+            route_id
+            for route_id, (origin_id, destination_id, _) in self.routes.items()
+            if origin_id in hops_from_origin
+            and destination_id in hops_to_destination
+            and hops_from_origin[origin_id] + 1
+            + hops_to_destination[destination_id] <= max_legs
+        ]
+        if not route_ids:
+            return []
+
+        first_departure_end = day_start + datetime.timedelta(days=1)
+        window_end = first_departure_end + (max_legs - 1) * (
+            max_connection + datetime.timedelta(days=1)
+        )
+        departures = defaultdict(list)
+        for flight_id, route_id, departure_time, arrival_time in (
+            Flight.objects.filter(
+                route_id__in=route_ids,
+                departure_time__gte=day_start,
+                departure_time__lt=window_end,
+            )
+            .order_by("departure_time")
+            .values_list("id", "route_id", "departure_time", "arrival_time")
+        ):
+            origin_id, destination_id, distance = self.routes[route_id]
+            departures[origin_id].append(
+                Leg(
+                    flight_id,
+                    route_id,
+                    origin_id,
+                    destination_id,
+                    self.airports[origin_id],
+                    self.airports[destination_id],
+                    distance,
+                    departure_time,
+                    arrival_time,
+                )
+            )
+        departure_times = {
+            airport_id: [leg.departure_time for leg in legs]
+            for airport_id, legs in departures.items()
+        }
+
+        itineraries = []
+
+        def extend(legs: list[Leg], visited: set[int]) -> None:
+            last_leg = legs[-1]
+            if last_leg.destination_id in destination_ids:
+                itineraries.append(Itinerary(legs))
+                return
+            if len(legs) == max_legs:
+                return
+
+            next_legs = departures.get(last_leg.destination_id, [])
+            start = bisect_left(
+                departure_times.get(last_leg.destination_id, []),
+                last_leg.arrival_time + min_connection,
+            )
+            latest_departure = last_leg.arrival_time + max_connection
+            for leg in next_legs[start:]:
+                if leg.departure_time > latest_departure:
+                    break
+                if (
+                    leg.destination_id not in visited
+                    and hops_to_destination.get(leg.destination_id, max_legs)
+                    <= max_legs - len(legs) - 1
+                ):
+                    extend(legs + [leg], visited | {leg.destination_id})
+
+        for origin_id in origin_ids:
+            for leg in departures.get(origin_id, []):
+                if leg.departure_time >= first_departure_end:
+                    break
+                extend([leg], {origin_id, leg.destination_id})
+
+        itineraries.sort(
+            key=lambda itinerary: (
+                itinerary.arrival_time,
+                len(itinerary.legs),
+                itinerary.distance,
+            )
+        )
+        return itineraries[:limit]
+
+
+def get_route_graph() -> RouteGraph:
+    """
+    Return the route graph of this process, rebuilding it when routes
+    or airports changed here or when it is older than ROUTE_GRAPH_TTL
+    (changes made by other processes).
+    """
+    global _route_graph, _route_graph_built_at
+
+    if (
+        _route_graph is None
+        or time.monotonic() - _route_graph_built_at > ROUTE_GRAPH_TTL
+    ):
+        _route_graph = RouteGraph()
+        _route_graph_built_at = time.monotonic()
+    return _route_graph
+
+
+def invalidate_route_graph(**kwargs) -> None:
+    global _route_graph
+
+    _route_graph = None
@@ -0,0 +1,131 @@
+import json
+import random
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.benchmarking import WSGIClient, run_threads
+from airport.models import Flight, Order, Ticket
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Measure bookings/second of concurrent clients racing for the "
+        "seats of one hot flight, and count conflicts (409) and errors. "
+        "Orders of the benchmark users are deleted before and after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=16)
+        parser.add_argument("--requests", type=int, default=1_000)
+        parser.add_argument(
+            "--tickets",
+            type=int,
+            default=2,
+            help="Seats per order.",
+        )
+        parser.add_argument(
+            "--flight",
+            type=int,
+            help="Flight id, the flight with the biggest airplane "
+                 "by default.",
+        )
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        flights = Flight.objects.select_related("airplane")
+        if options["flight"]:
+            flight = flights.filter(id=options["flight"]).first()
+        else:
+            flight = flights.order_by(
+                "-airplane__rows", "-airplane__seats_in_row", "id"
+            ).first()
+        if flight is None:
+            raise CommandError("No flight to book, run seed_airport first.")
+
+        users = [
+            get_user_model().objects.get_or_create(
+                email=f"benchmark-{client}@airport.local"
+            )[0]
+            for client in range(options["clients"])
+        ]
+        self.delete_orders(users)
+
+        seats = [
+            (row, seat)
+            for row in range(1, flight.airplane.rows + 1)
+            for seat in range(1, flight.airplane.seats_in_row + 1)
+        ]
+        rng = random.Random(options["seed"])
+        bodies = []
+        for request in range(options["requests"]):
+            body = json.dumps(
+                {
+                    "tickets": [
+                        {"row": row, "seat": seat, "flight": flight.id}
+                        for row, seat in rng.sample(seats, options["tickets"])
+                    ]
+                }
+            ).encode()
+            user = users[request % len(users)]
+            bodies.append((body, f"Bearer {AccessToken.for_user(user)}"))
+
+        client = WSGIClient(
+            REQUEST_METHOD="POST",
+            PATH_INFO=reverse("airport:order-list"),
+            CONTENT_TYPE="application/json",
+            HTTP_HOST=options["host"],
+        )
+
+        results, elapsed = run_threads(
+            lambda body_and_token: client.request(
+                body_and_token[0],
+                HTTP_AUTHORIZATION=body_and_token[1],
+            ),
+            bodies,
+            options["clients"],
+        )
+        statuses = Counter(results)
+
+        self.delete_orders(users)
+
+        errors = sum(
+            count for status, count in statuses.items()
+            if status not in (201, 409)
+        )
+        self.stdout.write(
+            "Flight {flight} ({seats} seats), {clients} clients: "
+            "{rate:,.0f} requests/s, {booked:,} booked, "
+            "{conflicts:,} conflicts, {errors} errors".format(
+                flight=flight.id,
+                seats=len(seats),
+                clients=options["clients"],
+                rate=options["requests"] / elapsed,
+                booked=statuses[201],
+                conflicts=statuses[409],
+                errors=errors,
+            )
+        )
+        if errors:
+            self.stdout.write(
+                self.style.ERROR(
+                    "Statuses: {statuses}".format(
+                        statuses=dict(sorted(statuses.items()))
+                    )
+                )
+            )
+
+    @staticmethod
+    def delete_orders(users) -> None:
+        with transaction.atomic():
+            flight_ids = list(
+                Ticket.objects.filter(order__user__in=users)
+                .values_list("flight_id", flat=True)
+            )
+            Order.objects.filter(user__in=users).delete()
+            Flight.update_tickets_sold(flight_ids, sign=-1)
@@ -0,0 +1,107 @@
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.benchmarking import (
+    WSGIClient,
+    compare_environments,
+    run_threads,
+)
+
+# Environment of every compared mode, read by the settings.
+MODES = (
+    (
+        "new connection per request",
+        {"DB_POOL": "false", "DB_CONN_MAX_AGE": "0"},
+    ),
+    (
+        "persistent connections",
+        {"DB_POOL": "false", "DB_CONN_MAX_AGE": "60"},
+    ),
+    ("connection pool", {"DB_POOL": "true"}),
+)
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Measure requests/second of an endpoint served by the WSGI handler "
+        "from several threads, so database connections are opened, reused "
+        "or pooled as in production. Run it on a seeded database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2_000)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--path",
+            default="/api/airports/flights/?limit=10",
+        )
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Run the benchmark once per connection mode "
+                 "(" + ", ".join(mode for mode, _ in MODES) + ").",
+        )
+
+    def handle(self, *args, **options):
+        if options["compare"]:
+            self.compare(options)
+            return
+
+        user, _ = get_user_model().objects.get_or_create(
+            email="benchmark@airport.local"
+        )
+        url = urlsplit(options["path"])
+        client = WSGIClient(
+            REQUEST_METHOD="GET",
+            PATH_INFO=url.path,
+            QUERY_STRING=url.query,
+            HTTP_HOST=options["host"],
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}",
+        )
+
+        statuses, elapsed = run_threads(
+            lambda _: client.request(),
+            range(options["requests"]),
+            options["threads"],
+            warm_up=range(options["threads"]),
+        )
+
+        errors = sum(status >= 400 for status in statuses)
+        database = settings.DATABASES["default"]
+        if database.get("OPTIONS", {}).get("pool"):
+            mode = "connection pool"
+        elif database.get("CONN_MAX_AGE"):
+            mode = "persistent connections"
+        else:
+            mode = "new connection per request"
+        self.stdout.write(
+            "{mode}: {rate:,.0f} requests/s ({requests:,} requests, "
+            "{threads} threads, {errors} errors)".format(
+                mode=mode,
+                rate=options["requests"] / elapsed,
+                requests=options["requests"],
+                threads=options["threads"],
+                errors=errors,
+            )
+        )
+
+    def compare(self, options):
+        compare_environments(
+            self,
+            [
+                "--requests",
+                str(options["requests"]),
+                "--threads",
+                str(options["threads"]),
+                "--path",
+                options["path"],
+                "--host",
+                options["host"],
+            ],
+            MODES,
+        )
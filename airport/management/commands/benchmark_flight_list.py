@@ -0,0 +1,81 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport.models import Country, Flight
+from airport.seeding import seed_network
+from airport.views import FlightViewSet
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Compare the rows/second of the flight list with model instances "
+        "and with ?projection=flat. Fixture rows are rolled back afterwards, "
+        "run it on an empty database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flights", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        flights = options["flights"]
+        repeat = options["repeat"]
+        view = FlightViewSet.as_view({"get": "list"}, throttle_classes=())
+        factory = APIRequestFactory(SERVER_NAME="localhost")
+
+        if Country.objects.exists() or Flight.objects.exists():
+            raise CommandError(
+                "Airport tables are not empty, generated names would "
+                "collide with existing rows. Run `manage.py flush` first."
+            )
+
+        with transaction.atomic():
+            seed_network(flights=flights)
+            user, _ = get_user_model().objects.get_or_create(
+                email="benchmark@airport.local"
+            )
+
+            rows_per_second = {}
+            for mode, params in (
+                ("instances", {}),
+                ("flat", {"projection": "flat"}),
+            ):
+                timings = []
+                rows = 0
+                for _ in range(repeat):
+                    request = factory.get(
+                        "/api/airports/flights/",
+                        {"limit": flights, **params},
+                    )
+                    force_authenticate(request, user=user)
+                    start = time.perf_counter()
+                    response = view(request).render()
+                    timings.append(time.perf_counter() - start)
+                    rows = len(response.data["results"])
+
+                rows_per_second[mode] = rows / min(timings)
+                self.stdout.write(
+                    "{mode}: {rate:,.0f} rows/s ({rows:,} rows, best of "
+                    "{repeat}: {seconds:.3f}s)".format(
+                        mode=mode,
+                        rate=rows_per_second[mode],
+                        rows=rows,
+                        repeat=repeat,
+                        seconds=min(timings),
+                    )
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Flat projection is {speedup:.1f}x faster".format(
+                    speedup=rows_per_second["flat"]
+                    / rows_per_second["instances"]
+                )
+            )
+        )
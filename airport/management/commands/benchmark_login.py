@@ -0,0 +1,101 @@
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from airport.benchmarking import (
+    WSGIClient,
+    compare_environments,
+    run_threads,
+)
+
+PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Measure logins/second (JWT token pairs) per CPU core, served by "
+        "the WSGI handler from several threads with the PASSWORD_HASHER "
+        "of the settings, or with each hasher with --compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Run the benchmark once per hasher ("
+                 + ", ".join(settings.PASSWORD_HASHER_CLASSES) + ").",
+        )
+
+    def handle(self, *args, **options):
+        if options["compare"]:
+            self.compare(options)
+            return
+
+        user, _ = get_user_model().objects.get_or_create(
+            email="benchmark@airport.local"
+        )
+        # Hashed with the current hasher, as after the first login.
+        user.set_password(PASSWORD)
+        user.save(update_fields=["password"])
+
+        body = json.dumps(
+            {"email": user.email, "password": PASSWORD}
+        ).encode()
+        client = WSGIClient(
+            REQUEST_METHOD="POST",
+            PATH_INFO=reverse("user:token_obtain_pair"),
+            CONTENT_TYPE="application/json",
+            HTTP_HOST=options["host"],
+        )
+
+        statuses, elapsed = run_threads(
+            lambda _: client.request(body),
+            range(options["requests"]),
+            options["threads"],
+            warm_up=range(options["threads"]),
+        )
+
+        errors = sum(status >= 400 for status in statuses)
+        cores = min(
+            len(os.sched_getaffinity(0)),
+            options["threads"],
+            settings.PASSWORD_HASHING_THREADS,
+        )
+        rate = options["requests"] / elapsed
+        self.stdout.write(
+            "{hasher}: {rate:,.1f} logins/s, {per_core:,.1f} per core "
+            "({requests:,} requests, {threads} threads, {cores} cores, "
+            "{errors} errors)".format(
+                hasher=settings.PASSWORD_HASHER,
+                rate=rate,
+                per_core=rate / cores,
+                requests=options["requests"],
+                threads=options["threads"],
+                cores=cores,
+                errors=errors,
+            )
+        )
+
+    def compare(self, options):
+        compare_environments(
+            self,
+            [
+                "--requests",
+                str(options["requests"]),
+                "--threads",
+                str(options["threads"]),
+                "--host",
+                options["host"],
+            ],
+            (
+                (hasher, {"PASSWORD_HASHER": hasher})
+                for hasher in settings.PASSWORD_HASHER_CLASSES
+            ),
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from airport.idempotency import expired_before
+from airport.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Delete expired idempotency keys of order creation, "
+        "in batches. Run it every hour or so."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch_size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        cutoff = expired_before()
+        deleted = 0
+        while True:
+            ids = list(
+                IdempotencyKey.objects.filter(created_at__lte=cutoff)
+                .order_by("created_at")
+                .values_list("id", flat=True)[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            batch_deleted, _ = IdempotencyKey.objects.filter(
+                id__in=ids
+            ).delete()
+            deleted += batch_deleted
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Deleted {deleted} expired idempotency keys".format(
+                    deleted=deleted
+                )
+            )
+        )
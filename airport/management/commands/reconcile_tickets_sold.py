@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from airport.booking import lock_flights
+from airport.cache import bump_generation
+from airport.models import Flight, Ticket
+
+
+class Command(BaseCommand):
+    help = "Recount Flight.tickets_sold from the tickets table"  # noqa: VNE003
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry_run",
+            action="store_true",
+            help="Only report flights with a wrong counter",
+        )
+
+    def handle(self, *args, **options):
+        tickets_count = Subquery(
+            Ticket.objects
+            .filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+
+        drifted = (
+            Flight.objects
+            .annotate(actual_tickets_sold=Coalesce(tickets_count, 0))
+            .exclude(tickets_sold=F("actual_tickets_sold"))
+        )
+
+        with transaction.atomic():
+            if not options["dry_run"]:
+                # A booking committed between the count and the update
+                # would be lost: count again with the flights locked.
+                flight_ids = list(drifted.values_list("id", flat=True))
+                lock_flights(flight_ids)
+                drifted = drifted.filter(id__in=flight_ids)
+
+            corrected = 0
+            for flight_id, tickets_sold, actual_tickets_sold in (
+                    drifted.values_list(
+                        "id", "tickets_sold", "actual_tickets_sold"
+                    )
+            ):
+                self.stdout.write(
+                    "Flight {flight_id}: tickets_sold is {tickets_sold},"
+                    " actual {actual_tickets_sold}".format(
+                        flight_id=flight_id,
+                        tickets_sold=tickets_sold,
+                        actual_tickets_sold=actual_tickets_sold,
+                    )
+                )
+                if not options["dry_run"]:
+                    # updated_at and the generation change the ETags of
+                    # the flight, so clients stop getting 304 Not Modified.
+                    corrected += Flight.objects.filter(id=flight_id).update(
+                        tickets_sold=actual_tickets_sold,
+                        updated_at=timezone.now(),
+                    )
+            if corrected:
+                bump_generation(Flight)
+
+        if not options["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Tickets sold reconciled, {corrected} flights "
+                    "corrected".format(corrected=corrected)
+                )
+            )
@@ -0,0 +1,128 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.scheduling import (
+    FORMATS,
+    format_from_name,
+    read_rows,
+    schedule_flights,
+)
+from airport.serializers import FlightPatternSerializer
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Create many flights at once, ex. a season's timetable, from a "
+        "CSV/JSON Lines file with airplane, route, crew, departure_time "
+        "and arrival_time columns, or from a weekly pattern. Nothing is "
+        "created when a row has errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            help="CSV with a header line (crew ids separated by ';') or "
+                 "JSON Lines file, - for the standard input.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of the file, by its extension by default.",
+        )
+        parser.add_argument("--airplane", type=int)
+        parser.add_argument("--route", type=int)
+        parser.add_argument("--crew", type=int, nargs="*", default=[])
+        parser.add_argument("--first_date", help="ex. 2025-03-30")
+        parser.add_argument("--last_date", help="ex. 2025-10-25")
+        parser.add_argument(
+            "--weekdays",
+            type=int,
+            nargs="+",
+            default=list(range(1, 8)),
+            help="ISO weekdays, 1 is Monday. Every day by default.",
+        )
+        parser.add_argument("--departure_time", help="Local time, ex. 08:30")
+        parser.add_argument("--duration", type=int, help="Minutes")
+        parser.add_argument("--batch_size", type=int, default=1_000)
+        parser.add_argument(
+            "--dry_run",
+            action="store_true",
+            help="Only validate the flights",
+        )
+
+    def pattern_rows(self, options):
+        serializer = FlightPatternSerializer(
+            data={
+                field: options[field]
+                for field in FlightPatternSerializer().fields
+                if options[field] is not None
+            }
+        )
+        if not serializer.is_valid():
+            raise CommandError(
+                "Invalid pattern: {errors}".format(
+                    errors=dict(serializer.errors)
+                )
+            )
+        return FlightPatternSerializer.rows(serializer.validated_data)
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            name = options["file"]
+            file_format = options["format"] or format_from_name(name)
+            if file_format not in FORMATS:
+                raise CommandError(
+                    "Use a .csv or .jsonl file, or give --format."
+                )
+            try:
+                timetable_file = (
+                    sys.stdin if name == "-"
+                    else open(name, encoding="utf-8-sig", newline="")
+                )
+            except OSError as error:
+                raise CommandError(error) from error
+            rows = read_rows(timetable_file, file_format)
+        else:
+            timetable_file = None
+            rows = self.pattern_rows(options)
+
+        try:
+            result = schedule_flights(
+                rows,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+        except (UnicodeDecodeError, csv.Error) as error:
+            raise CommandError(f"Cannot read the file: {error}") from error
+        finally:
+            if timetable_file not in (None, sys.stdin):
+                timetable_file.close()
+
+        for error in result.errors:
+            for field, messages in error["errors"].items():
+                for message in messages:
+                    self.stdout.write(
+                        self.style.ERROR(
+                            "Row {row}: {field}: {message}".format(
+                                row=error["row"],
+                                field=field,
+                                message=message,
+                            )
+                        )
+                    )
+        if result.errors:
+            raise CommandError(
+                "{errors} rows have errors, no flights were "
+                "scheduled".format(errors=len(result.errors))
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{verb} {flights} flights".format(
+                    verb="Validated" if options["dry_run"] else "Scheduled",
+                    flights=result.valid,
+                )
+            )
+        )
@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.models import Country, Flight, Order
+from airport.seeding import seed_network, seed_orders, seed_users
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Generate a deterministic airport network with flights, orders and "
+        "tickets for load testing. Run it on an empty database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--countries", type=int, default=50)
+        parser.add_argument("--locations_per_country", type=int, default=10)
+        parser.add_argument("--airports_per_location", type=int, default=1)
+        parser.add_argument("--routes", type=int, default=5_000)
+        parser.add_argument("--airplanes", type=int, default=500)
+        parser.add_argument("--crews", type=int, default=2_000)
+        parser.add_argument("--flights", type=int, default=10_000)
+        parser.add_argument("--users", type=int, default=1_000)
+        parser.add_argument("--tickets", type=int, default=100_000)
+        parser.add_argument("--tickets_per_order", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch_size", type=int, default=10_000)
+
+    def progress(self, what: str, done: int, total: int) -> None:
+        self.stdout.write(
+            "{what}: {done:,}/{total:,} ({percent:.0f}%) "
+            "{elapsed:.1f}s".format(
+                what=what,
+                done=done,
+                total=total,
+                percent=100 * done / total if total else 100,
+                elapsed=time.monotonic() - self.started_at,
+            )
+        )
+
+    def handle(self, *args, **options):
+        if (
+            Country.objects.exists()
+            or Flight.objects.exists()
+            or Order.objects.exists()
+        ):
+            raise CommandError(
+                "Airport tables are not empty, generated names would "
+                "collide with existing rows. Run `manage.py flush` first."
+            )
+
+        self.started_at = time.monotonic()
+        seed_network(
+            countries=options["countries"],
+            locations_per_country=options["locations_per_country"],
+            airports_per_location=options["airports_per_location"],
+            routes=options["routes"],
+            airplanes=options["airplanes"],
+            crews=options["crews"],
+            flights=options["flights"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            progress=self.progress,
+        )
+        users = seed_users(
+            users=options["users"],
+            batch_size=options["batch_size"],
+        )
+        self.progress("users", len(users), options["users"])
+        seed_orders(
+            users=users,
+            orders=options["tickets"] // options["tickets_per_order"],
+            tickets_per_order=options["tickets_per_order"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            progress=self.progress,
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Airport data generated in {elapsed:.1f}s".format(
+                    elapsed=time.monotonic() - self.started_at
+                )
+            )
+        )
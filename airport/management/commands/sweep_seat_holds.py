@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from airport.models import Flight, SeatHold
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Delete expired seat holds, so flight lists stop reporting "
+        "their seats as held. Run it every minute or so."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry_run",
+            action="store_true",
+            help="Only report the number of expired holds",
+        )
+
+    def handle(self, *args, **options):
+        expired = SeatHold.objects.filter(expires_at__lte=timezone.now())
+
+        with transaction.atomic():
+            flight_ids = set(
+                expired.order_by()
+                .values_list("flight_id", flat=True)
+                .distinct()
+            )
+            if options["dry_run"]:
+                deleted = expired.count()
+            else:
+                deleted, _ = expired.delete()
+                Flight.touch(flight_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{verb} {deleted} expired seat holds of {flights} "
+                "flights".format(
+                    verb="Found" if options["dry_run"] else "Deleted",
+                    deleted=deleted,
+                    flights=len(flight_ids),
+                )
+            )
+        )
@@ -10,6 +10,12 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--poll_seconds", type=float, default=3)
         parser.add_argument("--max_retries", type=int, default=60)
+        parser.add_argument(
+            "--warm_pool",
+            action="store_true",
+            help="Once the database is up, wait until the connection pool "
+                 "holds its minimum number of connections.",
+        )
 
     def handle(self, *args, **options):
         max_retries = options["max_retries"]
@@ -33,3 +39,31 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.ERROR("Database unavailable"))
             sys.exit(1)
+
+        if options["warm_pool"]:
+            self.warm_pool(timeout=max_retries * poll_seconds)
+
+    def warm_pool(self, timeout: float) -> None:
+        pool = getattr(connection, "pool", None)
+        if pool is None:
+            self.stdout.write("Connection pooling is disabled")
+            return
+
+        from psycopg_pool import PoolTimeout
+
+        # Give back the connection taken by ensure_connection().
+        connection.close()
+        try:
+            pool.wait(timeout=timeout)
+        except PoolTimeout as ex:
+            self.stdout.write(
+                self.style.ERROR(
+                    "Connection pool not ready: {error}".format(error=ex)
+                )
+            )
+            sys.exit(1)
+        self.stdout.write(
+            "Connection pool ready with {size} connections".format(
+                size=pool.get_stats()["pool_size"]
+            )
+        )
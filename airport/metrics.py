@@ -0,0 +1,277 @@
+"""
+Counters and histograms exported in the Prometheus text format.
+
+Every process keeps its own values. When AIRPORT_METRICS_DIR is set
+(several worker processes), each process also writes them to
+<AIRPORT_METRICS_DIR>/<pid>.json at most every AIRPORT_METRICS_FLUSH_INTERVAL
+seconds, and the exposition sums the files of all processes, so any worker
+can answer a scrape. Point it at an empty directory, cleaned on deploy.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._flushed_at = 0.0
+
+    def register(self, metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        """{metric name: [[label values, value], ...]} of this process."""
+        with self._lock:
+            return {
+                name: [
+                    [list(labels), value]
+                    for labels, value in metric.values.items()
+                ]
+                for name, metric in self._metrics.items()
+            }
+
+    def updated(self) -> None:
+        """Called by metrics after every change."""
+        if (
+            settings.AIRPORT_METRICS_DIR
+            and time.monotonic() - self._flushed_at
+            >= settings.AIRPORT_METRICS_FLUSH_INTERVAL
+        ):
+            self._flushed_at = time.monotonic()
+            self.flush()
+
+    def flush(self) -> None:
+        """Write this process' values to its file in AIRPORT_METRICS_DIR."""
+        if not settings.AIRPORT_METRICS_DIR:
+            return
+        directory = Path(settings.AIRPORT_METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{os.getpid()}.json"
+        tmp_path = directory / f"{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp_path, path)
+
+    def collect(self) -> dict:
+        """
+        Values of every process (or of this one only without
+        AIRPORT_METRICS_DIR), keyed on metric name then label values.
+        """
+        if not settings.AIRPORT_METRICS_DIR:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush()
+            snapshots = []
+            for path in Path(settings.AIRPORT_METRICS_DIR).glob("*.json"):
+                try:
+                    snapshots.append(json.loads(path.read_text()))
+                except (OSError, ValueError):
+                    # Replaced or removed while reading.
+                    continue
+
+        collected = {name: {} for name in self._metrics}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                if name not in self._metrics:
+                    continue
+                metric = self._metrics[name]
+                for labels, value in values:
+                    labels = tuple(labels)
+                    collected[name][labels] = metric.merge(
+                        collected[name].get(labels),
+                        value,
+                    )
+        return collected
+
+    def exposition(self) -> str:
+        collected = self.collect()
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.metric_type}")
+            for labels, value in sorted(collected[name].items()):
+                for suffix, extra_labels, sample in metric.samples(value):
+                    label_text = _format_labels(
+                        [
+                            *zip(metric.labelnames, labels, strict=True),
+                            *extra_labels,
+                        ]
+                    )
+                    lines.append(f"{name}{suffix}{label_text} {sample}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: list) -> str:
+    if not labels:
+        return ""
+    return "{%s}" % ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace('"', '\\"'),
+        )
+        for name, value in labels
+    )
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+class Metric:
+    metric_type = ""
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple = (),
+            registry: Registry = registry,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.registry = registry
+        # Unlabelled metrics are exported from zero.
+        self.values = {} if labelnames else {(): self.zero()}
+        registry.register(self)
+
+    def _labels(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, "
+                f"got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._labels(labels)
+        with self.registry._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        self.registry.updated()
+
+    @staticmethod
+    def zero():
+        return 0
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+    @staticmethod
+    def samples(value):
+        yield "", (), value
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(self, *args, buckets: tuple = DEFAULT_BUCKETS, **kwargs):
+        self.buckets = (*buckets, float("inf"))
+        super().__init__(*args, **kwargs)
+
+    def zero(self) -> list:
+        """Values are [count per bucket..., sum]."""
+        return [0] * len(self.buckets) + [0.0]
+
+    def observe(self, amount: float, **labels) -> None:
+        key = self._labels(labels)
+        with self.registry._lock:
+            if key not in self.values:
+                self.values[key] = self.zero()
+            value = self.values[key]
+            value[bisect_left(self.buckets, amount)] += 1
+            value[-1] += amount
+        self.registry.updated()
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return list(value)
+        return [a + b for a, b in zip(total, value, strict=True)]
+
+    def samples(self, value):
+        cumulative = 0
+        # The sum follows the bucket counts in `value`.
+        for bound, count in zip(self.buckets, value, strict=False):
+            cumulative += count
+            yield "_bucket", (("le", _format_bound(bound)),), cumulative
+        yield "_sum", (), value[-1]
+        yield "_count", (), cumulative
+
+
+ORDERS_CREATED = Counter(
+    "airport_orders_created_total",
+    "Orders created.",
+)
+TICKETS_SOLD = Counter(
+    "airport_tickets_sold_total",
+    "Tickets sold.",
+)
+ORDER_CREATE_SECONDS = Histogram(
+    "airport_order_create_seconds",
+    "Time to book an order, with the flights locked, "
+    "rejected bookings included.",
+)
+IDEMPOTENT_REPLAYS = Counter(
+    "airport_idempotent_replays_total",
+    "Order creations answered with the stored response of an earlier "
+    "request with the same Idempotency-Key.",
+)
+SEAT_CONFLICTS = Counter(
+    "airport_seat_conflicts_total",
+    "Orders (stage lock or commit) and seat holds (stage hold) rejected "
+    "because a seat was sold or held.",
+    ("stage",),
+)
+FLIGHT_REQUEST_SECONDS = Histogram(
+    "airport_flight_request_seconds",
+    "Time to answer flight list and retrieve requests.",
+    ("action",),
+)
+TOKENS_ISSUED = Counter(
+    "airport_tokens_issued_total",
+    "JWT token pair requests by outcome.",
+    ("outcome",),
+)
+TOKEN_ISSUE_SECONDS = Histogram(
+    "airport_token_issue_seconds",
+    "Time to check credentials and issue a JWT token pair.",
+)
+THROTTLED_REQUESTS = Counter(
+    "airport_throttled_requests_total",
+    "Requests rejected by a throttle.",
+    ("scope",),
+)
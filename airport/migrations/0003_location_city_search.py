@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+def normalize_city(city: str) -> str:
+    # Location.normalize_city when this migration was written.
+    return " ".join(city.replace("-", " ").split()).casefold()
+
+
+def fill_city_key(apps, schema_editor):
+    """Fill `city_key` of locations created before the column existed."""
+    Location = apps.get_model("airport", "Location")
+    db_alias = schema_editor.connection.alias
+    locations = list(Location.objects.using(db_alias).filter(city_key=""))
+    for location in locations:
+        location.city_key = normalize_city(location.city)
+    Location.objects.using(db_alias).bulk_update(
+        locations, ["city_key"], batch_size=1000
+    )
+
+
+def create_trigram_index(apps, schema_editor):
+    """
+    On PostgreSQL, serve the default `contains` city match from a
+    trigram index. Other databases scan `city_key` instead.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS location_city_key_trgm_idx "
+        "ON airport_location USING gin (city_key gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS location_city_key_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0002_initial"),
+    ]
+
+    operations = [
+        # Same as the `_like` index of city_key's db_index on PostgreSQL.
+        migrations.RemoveIndex(
+            model_name="location",
+            name="location_city_key_prefix_idx",
+        ),
+        migrations.RunPython(fill_city_key, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -1,10 +1,21 @@
 import pathlib
 import uuid
+from collections import Counter
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
-from django.db.models import UniqueConstraint
+from django.db.models import (
+    Count,
+    F,
+    OuterRef,
+    Subquery,
+    UniqueConstraint,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.text import slugify
 
+from airport.cache import bump_generation
 from airport_api_service import settings
 
 
@@ -61,6 +72,14 @@ class Country(models.Model):
 
 class Location(models.Model):
     city = models.CharField(max_length=64)
+    # On PostgreSQL, db_index adds a varchar_pattern_ops index too,
+    # which serves `LIKE 'prefix%'`.
+    city_key = models.CharField(
+        max_length=64,
+        db_index=True,
+        default="",
+        editable=False,
+    )
     country = models.ForeignKey(
         Country,
         on_delete=models.CASCADE,
@@ -76,6 +95,25 @@ class Location(models.Model):
         ]
         ordering = ["country__name", "city"]
 
+    @staticmethod
+    def normalize_city(city: str) -> str:
+        return " ".join(city.replace("-", " ").split()).casefold()
+
+    def save(
+            self,
+            force_insert=False,
+            force_update=False,
+            using=None,
+            update_fields=None,
+    ):
+        self.city_key = Location.normalize_city(self.city)
+        return super(Location, self).save(
+            force_insert,
+            force_update,
+            using,
+            update_fields,
+        )
+
     def __str__(self):
         return f"{self.city}, {self.country}"
 
@@ -178,6 +216,67 @@ class Flight(models.Model):
     )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time", "id"],
+                name="flight_departure_time_id_idx",
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+        ]
+        ordering = ["departure_time", "id"]
+
+    @staticmethod
+    def update_tickets_sold(flight_ids: list[int], sign: int = 1) -> None:
+        """
+        Add one sold ticket per occurrence of a flight id
+        (or remove it when `sign` is -1).
+        Flights are updated in id order to avoid deadlocks
+        between concurrent orders.
+        """
+        for flight_id, count in sorted(Counter(flight_ids).items()):
+            Flight.objects.filter(id=flight_id).update(
+                tickets_sold=F("tickets_sold") + sign * count,
+                updated_at=timezone.now(),
+            )
+        bump_generation(Flight)
+
+    @staticmethod
+    def touch(flight_ids) -> None:
+        """Mark the seats of the flights as changed, ex. by seat holds."""
+        Flight.objects.filter(id__in=flight_ids).update(
+            updated_at=timezone.now()
+        )
+        bump_generation(Flight)
+
+    @staticmethod
+    def seats_held():
+        """Number of seats held on the outer flight, as a subquery."""
+        return Coalesce(
+            Subquery(
+                SeatHold.objects.active()
+                .filter(flight=OuterRef("pk"))
+                .order_by()
+                .values("flight")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+
+    def unavailable_seats(self):
+        """(row, seat) of the seats sold or held, with a single query."""
+        return (
+            self.tickets.order_by().values_list("row", "seat")
+            .union(self.holds.active().order_by().values_list("row", "seat"))
+            .order_by("row", "seat")
+        )
 
     @staticmethod
     def validate_departure_time_not_later_arrival_time(
@@ -212,6 +311,7 @@ class Flight(models.Model):
             update_fields=None,
     ):
         self.full_clean()
+        self.updated_at = timezone.now()
         return super(Flight, self).save(
             force_insert,
             force_update,
@@ -234,6 +334,17 @@ class Order(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="order_user_created_at_id_idx",
+            ),
+            # Exports by creation date, see airport.exports.
+            models.Index(
+                fields=["created_at", "id"],
+                name="order_created_at_id_idx",
+            ),
+        ]
         ordering = ["-created_at"]
 
     def __str__(self):
@@ -299,6 +410,56 @@ class Ticket(models.Model):
                 }
             )
 
+    @staticmethod
+    def validate_seats_not_repeated(tickets_data: list[dict], error_to_raise):
+        """
+        Check that an order does not request a seat twice.
+        Errors are reported per ticket, in the order they were requested.
+        """
+        requested = set()
+        errors = []
+        for ticket in tickets_data:
+            key = (ticket["flight"].id, ticket["row"], ticket["seat"])
+            if key in requested:
+                errors.append(
+                    {
+                        "seat": (
+                            f"Seat {ticket['seat']} in row {ticket['row']} "
+                            f"is requested twice on flight {key[0]}"
+                        )
+                    }
+                )
+            else:
+                errors.append({})
+            requested.add(key)
+
+        if any(errors):
+            raise error_to_raise(errors)
+
+    @staticmethod
+    def taken_seats(requested: list[tuple], user_id=None) -> list[tuple]:
+        """
+        Return the (flight id, row, seat) of `requested` already sold or
+        held by a user other than `user_id`, in the requested order,
+        with a single query.
+        """
+        flight_ids = {flight_id for flight_id, _, _ in requested}
+        rows = {row for _, row, _ in requested}
+        taken = set(
+            Ticket.objects.filter(flight_id__in=flight_ids, row__in=rows)
+            .order_by()
+            .values_list("flight_id", "row", "seat")
+            .union(
+                SeatHold.objects.active()
+                .filter(flight_id__in=flight_ids, row__in=rows)
+                .exclude(user_id=user_id)
+                .order_by()
+                .values_list("flight_id", "row", "seat"),
+                all=True,
+            )
+        )
+        return [seat for seat in requested if seat in taken]
+
     def clean(self):
         Ticket.validate_seat(
             self.row,
@@ -322,3 +483,99 @@ class Ticket(models.Model):
             using,
             update_fields,
         )
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(models.Model):
+    """
+    A seat reserved for a user until `expires_at`, while they check out.
+    Expired holds are ignored by reads and deleted by the next hold or
+    booking of their flight, or by the sweep_seat_holds command.
+    """
+
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight,
+        on_delete=models.CASCADE,
+        related_name="holds",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    expires_at = models.DateTimeField()
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["row", "seat", "flight"],
+                name="unique_seat_hold_row_seat_flight",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["flight", "expires_at"],
+                name="seat_hold_flight_expires_idx",
+            ),
+            models.Index(
+                fields=["expires_at"],
+                name="seat_hold_expires_at_idx",
+            ),
+        ]
+        ordering = ["row", "seat"]
+
+    @property
+    def row_and_seat(self):
+        return f"row: {self.row}, seat: {self.seat}"
+
+    def __str__(self):
+        return (
+            f"Row: {self.row} Seat: {self.seat}, Flight: {self.flight}, "
+            f"held until {self.expires_at}"
+        )
+
+
+class IdempotencyKey(models.Model):
+    """
+    First response to a POST /orders/ with an Idempotency-Key header,
+    replayed to the retries of the same user with the same key.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+    key = models.CharField(max_length=255)
+    request_digest = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["user", "key"],
+                name="unique_idempotency_key_user_key",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                name="idempotency_key_created_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.key} of {self.user}"
@@ -0,0 +1,33 @@
+from rest_framework.pagination import CursorPagination
+
+
+class FlightCursorPagination(CursorPagination):
+    ordering = ("departure_time", "id")
+
+
+class OrderCursorPagination(CursorPagination):
+    ordering = ("-created_at", "-id")
+
+
+class CursorPaginationMixin:
+    """
+    Switches a viewset from the default limit/offset pagination
+    to `cursor_pagination_class` when the client asks for it
+    with `?pagination=cursor`.
+    Cursor pages cost the same regardless of their depth.
+    """
+
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if (
+                self.cursor_pagination_class is not None
+                and self.request is not None
+                and self.request.query_params.get("pagination") == "cursor"
+            ):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
@@ -2,6 +2,11 @@ from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 
 class IsAdminAllORIsAuthenticatedReadOnly(BasePermission):
+    """
+    Reads only `is_authenticated` and `is_staff`, so it is answered from
+    the token claims of a stateless TokenUser, without loading the user.
+    """
+
     def has_permission(self, request, view):
         return bool(
             request.method in SAFE_METHODS
@@ -0,0 +1,132 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import OperationalError
+from rest_framework.permissions import SAFE_METHODS
+
+from airport.cache import get_cache
+
+# Alias of the replica chosen for the current request, None for the
+# primary. It is chosen once, so a response does not mix replicas
+# lagging by different amounts.
+_read_database = ContextVar("airport_read_database", default=None)
+
+# Replica alias -> time.monotonic() until which it is not tried again.
+_unavailable_until = {}
+
+
+def pin_key(user) -> str:
+    return f"airport:primary:user:{user.pk}"
+
+
+def pin_to_primary(user) -> None:
+    """Send reads of `user` to the primary database for
+    AIRPORT_READ_YOUR_WRITES_SECONDS, so they see their own writes
+    before the replicas catch up."""
+    get_cache().set(
+        pin_key(user),
+        True,
+        settings.AIRPORT_READ_YOUR_WRITES_SECONDS,
+    )
+
+
+def is_pinned_to_primary(user) -> bool:
+    return bool(
+        user
+        and user.is_authenticated
+        and get_cache().get(pin_key(user))
+    )
+
+
+def available_replica() -> Optional[str]:
+    """
+    Return the alias of a random reachable replica, or None when all of
+    them are down. A replica that fails to connect is skipped for
+    AIRPORT_REPLICA_RETRY_SECONDS.
+    """
+    now = time.monotonic()
+    replicas = [
+        alias
+        for alias in settings.DATABASE_REPLICAS
+        if _unavailable_until.get(alias, 0) <= now
+    ]
+    random.shuffle(replicas)
+    for alias in replicas:
+        try:
+            connections[alias].ensure_connection()
+        except OperationalError:
+            _unavailable_until[alias] = (
+                now + settings.AIRPORT_REPLICA_RETRY_SECONDS
+            )
+        else:
+            return alias
+    return None
+
+
+class ReplicaRouter:
+    """
+    Send reads of ReplicaReadMixin views to DATABASE_REPLICAS and
+    everything else, writes included, to the primary database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Instances read from a replica are saved to the primary too.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    Read from a replica while answering safe requests, unless the user
+    is pinned to the primary after a recent write. Unsafe requests
+    pin the user.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _read_database.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_database.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication and permissions read from the primary.
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            if request.user and request.user.is_authenticated:
+                pin_to_primary(request.user)
+        elif not is_pinned_to_primary(request.user):
+            _read_database.set(available_replica())
+
+    @contextmanager
+    def fresh_reads(self, written_at: float):
+        """
+        Read from the primary when the rows of a cached response or of
+        its ETag were last written at `written_at` (a timestamp), less
+        than AIRPORT_READ_YOUR_WRITES_SECONDS ago: a replica may not have
+        them yet, and its response would be kept under their new
+        generation until the next write.
+        """
+        lag = settings.AIRPORT_READ_YOUR_WRITES_SECONDS
+        if time.time() - written_at >= lag:
+            yield
+            return
+        token = _read_database.set(None)
+        try:
+            yield
+        finally:
+            _read_database.reset(token)
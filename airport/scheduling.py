@@ -0,0 +1,265 @@
+"""
+Bulk scheduling of flights, ex. the timetable of a season.
+
+Flight.save() runs full_clean() and each flight sets its crew with
+another few queries, so thousands of flights take thousands of round
+trips. Here rows are validated in chunks instead: the airplanes, routes
+and crew members referenced by a chunk are fetched with one query each,
+and errors are collected per row. When every row is valid, the flights
+and their Flight.crew.through rows are inserted with bulk_create in
+chunks, in one transaction. Otherwise nothing is inserted, so a fixed
+file can be loaded again without duplicating flights.
+"""
+import csv
+import datetime
+import json
+import os
+import re
+from itertools import islice
+from typing import IO, Iterable, Iterator, NamedTuple, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import PrimaryKeyRelatedField
+
+from airport.cache import bump_generation
+from airport.models import Airplane, Crew, Flight, Route
+
+FORMATS = ("csv", "jsonl")
+CREW_SEPARATOR = re.compile(r"[\s,;]+")
+# Same message as the related fields of the flight serializers.
+DOES_NOT_EXIST = PrimaryKeyRelatedField.default_error_messages[
+    "does_not_exist"
+]
+
+
+class ScheduleResult(NamedTuple):
+    valid: int
+    created: int
+    # [{"row": 1-based row number, "errors": {field: [message, ...]}}]
+    errors: list[dict]
+
+
+def format_from_name(name: str) -> str:
+    """Format of a file by its extension, ex. "csv" for timetable.csv."""
+    return os.path.splitext(name)[1].lstrip(".").lower()
+
+
+def read_rows(
+        lines: IO[str],
+        file_format: str,
+) -> Iterator[Optional[dict]]:
+    """
+    Rows of a CSV file with a header line, or of a JSON Lines file.
+    Lines which are not JSON objects are returned as None.
+    """
+    if file_format == "csv":
+        yield from csv.DictReader(lines)
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+def expand_pattern(
+        *,
+        airplane: int,
+        route: int,
+        crew: list[int],
+        first_date: datetime.date,
+        last_date: datetime.date,
+        weekdays: list[int],
+        departure_time: datetime.time,
+        duration: datetime.timedelta,
+) -> Iterator[dict]:
+    """
+    Rows of a flight departing at `departure_time` (local time) on the
+    `weekdays` (1 is Monday) from `first_date` to `last_date`.
+    """
+    day = first_date
+    while day <= last_date:
+        if day.isoweekday() in weekdays:
+            departure = timezone.make_aware(
+                datetime.datetime.combine(day, departure_time)
+            )
+            yield {
+                "airplane": airplane,
+                "route": route,
+                "crew": crew,
+                "departure_time": departure,
+                "arrival_time": departure + duration,
+            }
+        day += datetime.timedelta(days=1)
+
+
+def _parse_id(value) -> int:
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, str):
+        value = value.strip()
+    return int(value)
+
+
+def _parse_crew(value) -> list[int]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        value = CREW_SEPARATOR.split(value.strip())
+    return sorted({_parse_id(crew_id) for crew_id in value})
+
+
+def _parse_datetime(value) -> datetime.datetime:
+    if not isinstance(value, datetime.datetime):
+        value = parse_datetime(str(value).strip())
+        if value is None:
+            raise ValueError(value)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+PARSERS = {
+    "airplane": (_parse_id, "A valid integer is required."),
+    "route": (_parse_id, "A valid integer is required."),
+    "crew": (_parse_crew, "Use a list of crew ids (ex. 1;2 in CSV)."),
+    "departure_time": (
+        _parse_datetime,
+        "Use the ISO 8601 format (ex. 2024-09-16T14:00).",
+    ),
+    "arrival_time": (
+        _parse_datetime,
+        "Use the ISO 8601 format (ex. 2024-09-16T16:30).",
+    ),
+}
+
+
+def _parse_row(row: Optional[dict]) -> tuple[dict, dict]:
+    if row is None:
+        return {}, {
+            "non_field_errors": ["Expected an object of flight fields."]
+        }
+    values, errors = {}, {}
+    for field, (parse, message) in PARSERS.items():
+        if row.get(field) in (None, "") and field != "crew":
+            errors[field] = ["This field is required."]
+            continue
+        try:
+            values[field] = parse(row.get(field))
+        except (TypeError, ValueError):
+            errors[field] = [message]
+    if not errors:
+        try:
+            Flight.validate_departure_time_not_later_arrival_time(
+                values["departure_time"],
+                values["arrival_time"],
+                ValidationError,
+            )
+        except ValidationError as error:
+            errors.update(
+                (field, [message]) for field, message in error.detail.items()
+            )
+    return values, errors
+
+
+def _existing_ids(model, ids: set[int]) -> set[int]:
+    return set(
+        model.objects.filter(id__in=ids).values_list("id", flat=True)
+    )
+
+
+def _validate_chunk(
+        rows: list[tuple[int, Optional[dict]]],
+) -> tuple[list[tuple[Flight, list[int]]], list[dict]]:
+    parsed = [(number, *_parse_row(row)) for number, row in rows]
+    airplane_ids = _existing_ids(
+        Airplane,
+        {
+            values["airplane"]
+            for _, values, _ in parsed if "airplane" in values
+        },
+    )
+    route_ids = _existing_ids(
+        Route,
+        {values["route"] for _, values, _ in parsed if "route" in values},
+    )
+    crew_ids = _existing_ids(
+        Crew,
+        {
+            crew_id
+            for _, values, _ in parsed
+            for crew_id in values.get("crew", ())
+        },
+    )
+
+    flights, errors = [], []
+    for number, values, row_errors in parsed:
+        for field, ids in (("airplane", airplane_ids), ("route", route_ids)):
+            if field in values and values[field] not in ids:
+                row_errors[field] = [
+                    DOES_NOT_EXIST.format(pk_value=values[field])
+                ]
+        missing_crew = [
+            crew_id for crew_id in values.get("crew", ())
+            if crew_id not in crew_ids
+        ]
+        if missing_crew:
+            row_errors["crew"] = [
+                DOES_NOT_EXIST.format(pk_value=crew_id)
+                for crew_id in missing_crew
+            ]
+
+        if row_errors:
+            errors.append({"row": number, "errors": row_errors})
+        else:
+            flights.append(
+                (
+                    Flight(
+                        airplane_id=values["airplane"],
+                        route_id=values["route"],
+                        departure_time=values["departure_time"],
+                        arrival_time=values["arrival_time"],
+                    ),
+                    values["crew"],
+                )
+            )
+    return flights, errors
+
+
+def schedule_flights(
+        rows: Iterable[Optional[dict]],
+        *,
+        batch_size: int = 1000,
+        dry_run: bool = False,
+) -> ScheduleResult:
+    """
+    Validate the rows (airplane, route, crew, departure_time and
+    arrival_time), then create their flights if none of them has errors.
+    """
+    rows = enumerate(rows, start=1)
+    flights, errors = [], []
+    while chunk := list(islice(rows, batch_size)):
+        chunk_flights, chunk_errors = _validate_chunk(chunk)
+        flights.extend(chunk_flights)
+        errors.extend(chunk_errors)
+    if errors or dry_run:
+        return ScheduleResult(valid=len(flights), created=0, errors=errors)
+
+    with transaction.atomic():
+        for offset in range(0, len(flights), batch_size):
+            chunk = flights[offset:offset + batch_size]
+            Flight.objects.bulk_create(flight for flight, _ in chunk)
+            Flight.crew.through.objects.bulk_create(
+                Flight.crew.through(flight_id=flight.id, crew_id=crew_id)
+                for flight, crew_ids in chunk
+                for crew_id in crew_ids
+            )
+        # bulk_create does not send post_save, invalidate caches explicitly.
+        bump_generation(Flight)
+    return ScheduleResult(valid=len(flights), created=len(flights), errors=[])
@@ -0,0 +1,34 @@
+from rest_framework.exceptions import ValidationError
+
+from airport.models import Location
+
+CITY_MATCH_MODES = {
+    "contains": "city_key__contains",
+    "exact": "city_key",
+    "prefix": "city_key__startswith",
+}
+
+
+def get_city_match(query_params) -> str:
+    city_match = query_params.get("city_match", "contains")
+    if city_match not in CITY_MATCH_MODES:
+        raise ValidationError(
+            {
+                "city_match": (
+                    f"Must be one of: {', '.join(CITY_MATCH_MODES)}"
+                )
+            }
+        )
+    return city_match
+
+
+def city_location_ids(city: str, city_match: str = "contains") -> list[int]:
+    """
+    Resolve a city filter to location ids with one indexed query,
+    so the filtered queryset only compares integer foreign keys.
+    """
+    return list(
+        Location.objects.filter(
+            **{CITY_MATCH_MODES[city_match]: Location.normalize_city(city)}
+        ).values_list("id", flat=True)
+    )
@@ -0,0 +1,62 @@
+import base64
+from typing import Optional
+
+from airport.models import Flight
+
+
+class SeatMap:
+    """
+    Sold and held seats of a flight packed into a bitmap, one bit per seat.
+    Seats are numbered row by row: the seat (row, seat) has the index
+    (row - 1) * seats_in_row + (seat - 1) and is stored in the bit
+    index % 8 of the byte index // 8. Seats outside the map, ex. tickets
+    sold before the airplane lost rows, are only counted in
+    `seats_out_of_range`.
+    """
+
+    def __init__(self, rows: int, seats_in_row: int):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.bitmap = bytearray((rows * seats_in_row + 7) // 8)
+        self.seats_out_of_range = 0
+
+    @classmethod
+    def for_flight(cls, flight: Flight) -> "SeatMap":
+        seat_map = cls(flight.airplane.rows, flight.airplane.seats_in_row)
+        for row, seat in flight.unavailable_seats():
+            seat_map.take(row, seat)
+        return seat_map
+
+    def _index(self, row: int, seat: int) -> Optional[int]:
+        if not (1 <= row <= self.rows and 1 <= seat <= self.seats_in_row):
+            return None
+        return (row - 1) * self.seats_in_row + (seat - 1)
+
+    def take(self, row: int, seat: int) -> None:
+        index = self._index(row, seat)
+        if index is None:
+            self.seats_out_of_range += 1
+            return
+        self.bitmap[index >> 3] |= 1 << (index & 7)
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        index = self._index(row, seat)
+        if index is None:
+            return False
+        return bool(self.bitmap[index >> 3] & (1 << (index & 7)))
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    @property
+    def seats_taken(self) -> int:
+        return int.from_bytes(self.bitmap, "little").bit_count()
+
+    @property
+    def seats_available(self) -> int:
+        return self.capacity - self.seats_taken
+
+    @property
+    def packed(self) -> str:
+        return base64.b64encode(self.bitmap).decode("ascii")
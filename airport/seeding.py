@@ -0,0 +1,328 @@
+import datetime
+import math
+import random
+from array import array
+from typing import Callable, Iterable, Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.utils import timezone
+
+from airport.cache import bump_generation
+from airport.itineraries import invalidate_route_graph
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Country,
+    Crew,
+    Flight,
+    Location,
+    Order,
+    Route,
+    Ticket,
+)
+
+AIRPLANE_TYPES = (
+    ("Regional jet", 20, 4),
+    ("Narrow-body", 30, 6),
+    ("Wide-body", 45, 9),
+)
+CRUISE_SPEED_KMH = 800
+
+# Called after every batch with (what, done, total).
+Progress = Optional[Callable[[str, int, int], None]]
+
+
+def _distance_km(origin: tuple, destination: tuple) -> int:
+    """Great-circle distance between two (latitude, longitude) points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*origin, *destination))
+    haversine = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return max(1, round(2 * 6371 * math.asin(math.sqrt(haversine))))
+
+
+def _insert_rows(model, fields: list[str], rows: Iterable[tuple]) -> None:
+    """
+    Insert rows without fetching ids back: with COPY on PostgreSQL,
+    which is several times faster than INSERT, and with one bulk INSERT
+    on other databases.
+    """
+    if connection.vendor != "postgresql":
+        model.objects.bulk_create(
+            model(**dict(zip(fields, row, strict=True))) for row in rows
+        )
+        return
+
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(
+        quote_name(model._meta.get_field(field).column) for field in fields
+    )
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(
+                f"COPY {quote_name(model._meta.db_table)} ({columns}) "
+                f"FROM STDIN"
+        ) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def seed_network(
+        *,
+        countries: int = 10,
+        locations_per_country: int = 5,
+        airports_per_location: int = 1,
+        routes: int = 200,
+        airplanes: int = 20,
+        crews: int = 50,
+        flights: int = 1000,
+        seed: int = 0,
+        batch_size: int = 2000,
+        progress: Progress = None,
+) -> None:
+    """
+    Bulk create a deterministic airport network: the same arguments
+    always produce the same rows. Names are numbered so runs on an empty
+    database respect every unique constraint.
+    """
+    rng = random.Random(seed)
+
+    country_objs = Country.objects.bulk_create(
+        (Country(name=f"Country {i}") for i in range(countries)),
+        batch_size=batch_size,
+    )
+    location_objs = Location.objects.bulk_create(
+        (
+            Location(
+                city=f"City {country.id}-{i}",
+                city_key=Location.normalize_city(f"City {country.id}-{i}"),
+                country=country,
+            )
+            for country in country_objs
+            for i in range(locations_per_country)
+        ),
+        batch_size=batch_size,
+    )
+    airport_objs = Airport.objects.bulk_create(
+        (
+            Airport(name=f"Airport {i}", location=location)
+            for location in location_objs
+            for i in range(airports_per_location)
+        ),
+        batch_size=batch_size,
+    )
+    coordinates = {
+        airport.id: (rng.uniform(-60, 70), rng.uniform(-180, 180))
+        for airport in airport_objs
+    }
+
+    routes = min(routes, len(airport_objs) * (len(airport_objs) - 1))
+    pairs = set()
+    while len(pairs) < routes:
+        origin, destination = rng.sample(airport_objs, 2)
+        pairs.add((origin, destination))
+    route_objs = Route.objects.bulk_create(
+        (
+            Route(
+                origin=origin,
+                destination=destination,
+                distance=_distance_km(
+                    coordinates[origin.id],
+                    coordinates[destination.id],
+                ),
+            )
+            for origin, destination in sorted(
+                pairs,
+                key=lambda pair: (pair[0].id, pair[1].id),
+            )
+        ),
+        batch_size=batch_size,
+    )
+
+    airplane_type_objs = AirplaneType.objects.bulk_create(
+        AirplaneType(name=name) for name, _, _ in AIRPLANE_TYPES
+    )
+    airplane_objs = []
+    for i in range(airplanes):
+        type_index = rng.randrange(len(AIRPLANE_TYPES))
+        _, rows, seats_in_row = AIRPLANE_TYPES[type_index]
+        airplane_objs.append(
+            Airplane(
+                name=f"Airplane {i}",
+                rows=rows,
+                seats_in_row=seats_in_row,
+                airplane_type=airplane_type_objs[type_index],
+            )
+        )
+    airplane_objs = Airplane.objects.bulk_create(
+        airplane_objs,
+        batch_size=batch_size,
+    )
+    crew_ids = [
+        crew.id
+        for crew in Crew.objects.bulk_create(
+            (
+                Crew(first_name=f"First {i}", last_name=f"Last {i}")
+                for i in range(crews)
+            ),
+            batch_size=batch_size,
+        )
+    ]
+    if progress:
+        progress("routes", len(route_objs), routes)
+
+    start = timezone.now().replace(minute=0, second=0, microsecond=0)
+    for offset in range(0, flights, batch_size):
+        flight_objs = []
+        for _ in range(min(batch_size, flights - offset)):
+            route = rng.choice(route_objs)
+            departure_time = start + datetime.timedelta(
+                minutes=5 * rng.randrange(365 * 24 * 12)
+            )
+            flight_objs.append(
+                Flight(
+                    airplane=rng.choice(airplane_objs),
+                    route=route,
+                    departure_time=departure_time,
+                    arrival_time=departure_time + datetime.timedelta(
+                        minutes=30 + route.distance * 60 // CRUISE_SPEED_KMH
+                    ),
+                )
+            )
+        flight_objs = Flight.objects.bulk_create(flight_objs)
+        _insert_rows(
+            Flight.crew.through,
+            ["flight_id", "crew_id"],
+            [
+                (flight.id, crew_id)
+                for flight in flight_objs
+                for crew_id in rng.sample(crew_ids, min(2, len(crew_ids)))
+            ],
+        )
+        if progress:
+            progress("flights", offset + len(flight_objs), flights)
+
+    # bulk_create does not send post_save, invalidate caches explicitly.
+    for model in (
+        Country,
+        Location,
+        Airport,
+        Route,
+        AirplaneType,
+        Airplane,
+        Crew,
+        Flight,
+    ):
+        bump_generation(model)
+    invalidate_route_graph()
+
+
+def seed_users(*, users: int = 10, batch_size: int = 2000) -> list:
+    """Bulk create users sharing one password hash ("password")."""
+    password = make_password("password")
+    return get_user_model().objects.bulk_create(
+        (
+            get_user_model()(email=f"user{i}@airport.local", password=password)
+            for i in range(users)
+        ),
+        batch_size=batch_size,
+    )
+
+
+def seed_orders(
+        *,
+        users: list,
+        orders: int = 100,
+        tickets_per_order: int = 2,
+        seed: int = 0,
+        batch_size: int = 2000,
+        progress: Progress = None,
+) -> None:
+    """
+    Bulk create orders of `users` on existing flights. Seats are handed
+    out in order on each flight, so unique_ticket_row_seat_flight holds
+    and no flight is overbooked; orders stop when every flight is full.
+    Flight state is kept in arrays, a few bytes per flight.
+    """
+    rng = random.Random(seed)
+    flight_ids = array("q")
+    seats_in_rows = array("l")
+    capacities = array("l")
+    sold = array("l")
+    for flight_id, rows, seats_in_row, tickets_sold in (
+        Flight.objects.order_by("id").values_list(
+            "id", "airplane__rows", "airplane__seats_in_row", "tickets_sold",
+        ).iterator(chunk_size=batch_size)
+    ):
+        flight_ids.append(flight_id)
+        seats_in_rows.append(seats_in_row)
+        capacities.append(rows * seats_in_row)
+        sold.append(tickets_sold)
+    # Positions of flights which still have room, full ones are swapped out.
+    open_flights = array("q", range(len(flight_ids)))
+    booked_flights = set()
+
+    for offset in range(0, orders, batch_size):
+        booked = []
+        for _ in range(min(batch_size, orders - offset)):
+            while open_flights:
+                slot = rng.randrange(len(open_flights))
+                position = open_flights[slot]
+                if sold[position] + tickets_per_order <= capacities[position]:
+                    break
+                open_flights[slot] = open_flights[-1]
+                open_flights.pop()
+            else:
+                break
+            booked.append((position, sold[position]))
+            sold[position] += tickets_per_order
+            booked_flights.add(position)
+
+        order_objs = Order.objects.bulk_create(
+            Order(user=rng.choice(users)) for _ in booked
+        )
+        _insert_rows(
+            Ticket,
+            ["row", "seat", "flight_id", "order_id"],
+            (
+                (
+                    seat_index // seats_in_rows[position] + 1,
+                    seat_index % seats_in_rows[position] + 1,
+                    flight_ids[position],
+                    order.id,
+                )
+                for order, (position, first_seat_index) in zip(
+                    order_objs,
+                    booked,
+                    strict=True,
+                )
+                for seat_index in range(
+                    first_seat_index,
+                    first_seat_index + tickets_per_order,
+                )
+            ),
+        )
+        if progress:
+            progress("orders", offset + len(booked), orders)
+        if len(booked) < min(batch_size, orders - offset):
+            break
+
+    booked_flights = sorted(booked_flights)
+    for offset in range(0, len(booked_flights), batch_size):
+        Flight.objects.bulk_update(
+            [
+                Flight(id=flight_ids[position], tickets_sold=sold[position])
+                for position in booked_flights[offset:offset + batch_size]
+            ],
+            ["tickets_sold"],
+        )
+        if progress:
+            progress(
+                "tickets_sold",
+                min(offset + batch_size, len(booked_flights)),
+                len(booked_flights),
+            )
+    bump_generation(Flight)
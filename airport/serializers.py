@@ -1,6 +1,10 @@
-from django.db import transaction
+import datetime
+import io
+
 from rest_framework import serializers
 
+from airport.booking import book_tickets, hold_seats
+from airport.exports import FORMATS as EXPORT_FORMATS
 from airport.models import (
     Airplane,
     AirplaneType,
@@ -13,6 +17,12 @@ from airport.models import (
     Route,
     Ticket,
 )
+from airport.scheduling import (
+    FORMATS,
+    expand_pattern,
+    format_from_name,
+    read_rows,
+)
 
 
 class AirplaneTypeSerializer(serializers.ModelSerializer):
@@ -167,6 +177,20 @@ class FlightListSerializer(serializers.ModelSerializer):
         )
 
 
+class FlightFlatListSerializer(serializers.Serializer):
+    """Serializes the flat rows of `FlightViewSet` with ?projection=flat."""
+
+    id = serializers.IntegerField(read_only=True)  # noqa: VNE003
+    origin_city = serializers.CharField(read_only=True)
+    destination_city = serializers.CharField(read_only=True)
+    airplane_name = serializers.CharField(read_only=True)
+    airplane_type = serializers.CharField(read_only=True)
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    capacity = serializers.IntegerField(read_only=True)
+    seats_available = serializers.IntegerField(read_only=True)
+
+
 class FlightRetrieveSerializer(serializers.ModelSerializer):
     airplane = AirplaneListSerializer(many=False, read_only=True)
     crew = serializers.SlugRelatedField(
@@ -175,12 +199,7 @@ class FlightRetrieveSerializer(serializers.ModelSerializer):
         slug_field="full_name",
     )
     route = RouteListSerializer(many=False, read_only=True)
-    taken_seats = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="row_and_seat",
-        source="tickets",
-    )
+    taken_seats = serializers.SerializerMethodField()
 
     class Meta:
         model = Flight
@@ -194,11 +213,243 @@ class FlightRetrieveSerializer(serializers.ModelSerializer):
             "taken_seats",
         )
 
+    def get_taken_seats(self, flight) -> list[str]:
+        """Seats sold or held."""
+        return [
+            f"row: {row}, seat: {seat}"
+            for row, seat in flight.unavailable_seats()
+        ]
+
+
+class FlightPatternSerializer(serializers.Serializer):
+    airplane = serializers.PrimaryKeyRelatedField(
+        queryset=Airplane.objects.all()
+    )
+    route = serializers.PrimaryKeyRelatedField(queryset=Route.objects.all())
+    crew = serializers.PrimaryKeyRelatedField(
+        queryset=Crew.objects.all(),
+        many=True,
+        required=False,
+    )
+    first_date = serializers.DateField()
+    last_date = serializers.DateField()
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=7),
+        allow_empty=False,
+        help_text="ISO weekdays, 1 is Monday",
+    )
+    departure_time = serializers.TimeField(help_text="Local time")
+    duration = serializers.IntegerField(min_value=1, help_text="Minutes")
+
+    def validate(self, attrs):
+        if attrs["first_date"] > attrs["last_date"]:
+            raise serializers.ValidationError(
+                {"last_date": "Last date cannot be before first date."}
+            )
+        return attrs
+
+    @staticmethod
+    def rows(pattern: dict):
+        """Flight rows of the validated pattern."""
+        return expand_pattern(
+            airplane=pattern["airplane"].id,
+            route=pattern["route"].id,
+            crew=[crew.id for crew in pattern.get("crew", [])],
+            first_date=pattern["first_date"],
+            last_date=pattern["last_date"],
+            weekdays=pattern["weekdays"],
+            departure_time=pattern["departure_time"],
+            duration=datetime.timedelta(minutes=pattern["duration"]),
+        )
+
+
+class FlightScheduleSerializer(serializers.Serializer):
+    """
+    Flights to schedule, given by exactly one of `flights` (objects with
+    the fields of FlightSerializer), `pattern` or `upload`.
+    """
+
+    flights = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        required=False,
+    )
+    pattern = FlightPatternSerializer(required=False)
+    upload = serializers.FileField(
+        required=False,
+        help_text="CSV with a header line (crew ids separated by ';') "
+                  "or JSON Lines, by the .csv or .jsonl extension",
+    )
+    dry_run = serializers.BooleanField(
+        default=False,
+        help_text="Only validate the flights",
+    )
+
+    def validate_upload(self, upload):
+        if format_from_name(upload.name) not in FORMATS:
+            raise serializers.ValidationError(
+                "Use a .csv or .jsonl file."
+            )
+        return upload
+
+    def validate(self, attrs):
+        given = [
+            field for field in ("flights", "pattern", "upload")
+            if field in attrs
+        ]
+        if len(given) != 1:
+            raise serializers.ValidationError(
+                "Give exactly one of flights, pattern or upload."
+            )
+        return attrs
+
+    def rows(self):
+        if "flights" in self.validated_data:
+            return self.validated_data["flights"]
+        if "pattern" in self.validated_data:
+            return FlightPatternSerializer.rows(self.validated_data["pattern"])
+        upload = self.validated_data["upload"]
+        return read_rows(
+            io.TextIOWrapper(upload, encoding="utf-8-sig", newline=""),
+            format_from_name(upload.name),
+        )
+
+
+class FlightScheduleResultSerializer(serializers.Serializer):
+    valid = serializers.IntegerField(help_text="Flights without errors")
+    created = serializers.IntegerField()
+    errors = serializers.ListField(
+        child=serializers.DictField(),
+        help_text="Errors by field of each invalid row, numbered from 1",
+    )
+
+
+class SeatMapSerializer(serializers.Serializer):
+    rows = serializers.IntegerField(read_only=True)
+    seats_in_row = serializers.IntegerField(read_only=True)
+    capacity = serializers.IntegerField(read_only=True)
+    seats_available = serializers.IntegerField(read_only=True)
+    taken_seats = serializers.CharField(
+        source="packed",
+        read_only=True,
+        help_text="Base64 encoded bitmap of taken seats, one bit per seat "
+                  "numbered row by row, least significant bit first",
+    )
+    seats_out_of_range = serializers.IntegerField(
+        read_only=True,
+        help_text="Sold or held seats outside the rows and seats_in_row "
+                  "of the airplane, not part of taken_seats",
+    )
+
+
+class HeldSeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+    def validate(self, attrs):
+        flight = self.context["flight"]
+        Ticket.validate_seat(
+            attrs["row"],
+            attrs["seat"],
+            flight.airplane.rows,
+            flight.airplane.seats_in_row,
+            serializers.ValidationError,
+        )
+        return attrs
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    seats = HeldSeatSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def validate_seats(self, seats):
+        Ticket.validate_seats_not_repeated(
+            [{**seat, "flight": self.context["flight"]} for seat in seats],
+            serializers.ValidationError,
+        )
+        return seats
+
+    def create(self, validated_data):
+        expires_at = hold_seats(
+            self.context["flight"],
+            [(seat["row"], seat["seat"]) for seat in validated_data["seats"]],
+            validated_data["user_id"],
+        )
+        return {"seats": validated_data["seats"], "expires_at": expires_at}
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    origin = serializers.CharField()
+    destination = serializers.CharField()
+    date = serializers.DateField()
+    max_legs = serializers.IntegerField(min_value=1, max_value=3, default=2)
+    min_connection = serializers.IntegerField(
+        min_value=0,
+        default=45,
+        help_text="Minutes",
+    )
+    max_connection = serializers.IntegerField(
+        min_value=0,
+        max_value=24 * 60,
+        default=6 * 60,
+        help_text="Minutes",
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def validate(self, attrs):
+        if attrs["min_connection"] > attrs["max_connection"]:
+            raise serializers.ValidationError(
+                {
+                    "min_connection": (
+                        "Minimum connection time cannot be longer "
+                        "than maximum connection time."
+                    )
+                }
+            )
+        return attrs
+
+
+class ItineraryLegSerializer(serializers.Serializer):
+    flight = serializers.IntegerField(source="flight_id")
+    route = serializers.IntegerField(source="route_id")
+    origin = serializers.CharField()
+    destination = serializers.CharField()
+    distance = serializers.IntegerField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField(read_only=True)
+    arrival_time = serializers.DateTimeField(read_only=True)
+    distance = serializers.IntegerField(read_only=True)
+    legs = ItineraryLegSerializer(many=True, read_only=True)
+
+
+class FlightRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves every flight only once per request, together with its airplane,
+    so a group booking does not fetch the same flight for each ticket.
+    """
+
+    def to_internal_value(self, data):
+        flights = self.__dict__.setdefault("_flights", {})
+        if str(data) not in flights:
+            flights[str(data)] = super().to_internal_value(data)
+        return flights[str(data)]
+
 
 class TicketSerializer(serializers.ModelSerializer):
+    flight = FlightRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
     class Meta:
         model = Ticket
         fields = ("row", "seat", "flight",)
+        # Seat uniqueness is checked for the whole order at once,
+        # see OrderSerializer.validate_tickets.
+        validators = []
 
     def validate(self, attrs):
         Ticket.validate_seat(
@@ -222,14 +473,44 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "created_at", "tickets",)
 
+    def validate_tickets(self, tickets_data):
+        # Taken seats are checked while booking, with the flights locked.
+        Ticket.validate_seats_not_repeated(
+            tickets_data,
+            serializers.ValidationError,
+        )
+        return tickets_data
+
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+        tickets_data = validated_data.pop("tickets")
+        return book_tickets(tickets_data, **validated_data)
 
 
 class OrderListRetrieveSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class OrderExportSerializer(serializers.Serializer):
+    created_after = serializers.DateTimeField(
+        required=False,
+        help_text="Orders created at or after (ex. 2024-09-01)",
+    )
+    created_before = serializers.DateTimeField(
+        required=False,
+        help_text="Orders created before (ex. 2024-10-01)",
+    )
+    file_format = serializers.ChoiceField(
+        choices=EXPORT_FORMATS,
+        default="csv",
+    )
+
+    def validate(self, attrs):
+        if (
+            "created_after" in attrs
+            and "created_before" in attrs
+            and attrs["created_after"] >= attrs["created_before"]
+        ):
+            raise serializers.ValidationError(
+                {"created_before": "Must be later than created_after."}
+            )
+        return attrs
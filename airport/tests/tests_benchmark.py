@@ -0,0 +1,319 @@
+"""
+Query count and latency benchmark of every endpoint.
+
+Each endpoint is called BENCHMARK_REPEAT times against a seeded network
+scaled by BENCHMARK_SCALE, and the first (cold cache) call must stay
+under the endpoint's query bound. Bounds do not depend on the scale, so
+running with a larger BENCHMARK_SCALE catches queries that grow with
+the data. Set BENCHMARK_REPORT to a file path to write latency
+percentiles as JSON, ex.:
+
+    BENCHMARK_SCALE=20 BENCHMARK_REPEAT=50 BENCHMARK_REPORT=bench.json \\
+    python manage.py test airport.tests.tests_benchmark
+"""
+import itertools
+import json
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Country,
+    Crew,
+    Flight,
+    Location,
+    Order,
+    Route,
+)
+from airport.seeding import seed_network, seed_orders, seed_users
+
+BENCHMARK_SCALE = int(os.getenv("BENCHMARK_SCALE", 1))
+BENCHMARK_REPEAT = int(os.getenv("BENCHMARK_REPEAT", 3))
+BENCHMARK_REPORT = os.getenv("BENCHMARK_REPORT")
+
+PASSWORD = "1qazcde3"
+
+counter = itertools.count()
+
+
+def first_id(queryset) -> int:
+    if not hasattr(queryset, "values_list"):
+        queryset = queryset.objects.all()
+    return queryset.order_by("id").values_list("id", flat=True).first()
+
+
+def url(name, *args) -> str:
+    return reverse(name, args=args)
+
+
+def free_seat() -> dict:
+    flight = Flight.objects.order_by("tickets_sold", "id").select_related(
+        "airplane"
+    ).first()
+    # Seeded seats are handed out in order, the next one is free.
+    seat_index = flight.tickets_sold
+    return {
+        "row": seat_index // flight.airplane.seats_in_row + 1,
+        "seat": seat_index % flight.airplane.seats_in_row + 1,
+        "flight": flight.id,
+    }
+
+
+def free_seat_payload() -> dict:
+    return {"tickets": [free_seat()]}
+
+
+def hold_url() -> str:
+    return url("airport:flight-holds", free_seat()["flight"])
+
+
+def hold_payload() -> dict:
+    # Replaces the previous hold of the user on the flight.
+    seat = free_seat()
+    return {"seats": [{"row": seat["row"], "seat": seat["seat"]}]}
+
+
+def route_payload() -> dict:
+    location = Location.objects.order_by("id").first()
+    origin = Airport.objects.create(
+        name=f"Benchmark origin {next(counter)}",
+        location=location,
+    )
+    return {
+        "origin": origin.id,
+        "destination": first_id(Airport),
+        "distance": 1000,
+    }
+
+
+def flight_payload() -> dict:
+    return {
+        "airplane": first_id(Airplane),
+        "route": first_id(Route),
+        "crew": [first_id(Crew)],
+        "departure_time": "2030-01-01T10:00:00Z",
+        "arrival_time": "2030-01-01T12:00:00Z",
+    }
+
+
+def schedule_payload() -> dict:
+    # The bound does not depend on the number of flights scheduled.
+    return {"flights": [flight_payload() for _ in range(20)]}
+
+
+# (name, method, url, payload, query bound)
+# `url` and `payload` are callables, called before each measured request.
+ENDPOINTS = (
+    ("airplane_types-list", "get",
+     lambda: url("airport:airplanetype-list"), None, 2),
+    ("airplane_types-retrieve", "get",
+     lambda: url("airport:airplanetype-detail", first_id(AirplaneType)),
+     None, 1),
+    ("airplane_types-create", "post",
+     lambda: url("airport:airplanetype-list"),
+     lambda: {"name": f"Type {next(counter)}"}, 2),
+    ("airplanes-list", "get",
+     lambda: url("airport:airplane-list"), None, 2),
+    ("airplanes-retrieve", "get",
+     lambda: url("airport:airplane-detail", first_id(Airplane)), None, 1),
+    ("airplanes-create", "post",
+     lambda: url("airport:airplane-list"),
+     lambda: {
+         "name": f"Airplane benchmark {next(counter)}",
+         "rows": 10,
+         "seats_in_row": 4,
+         "airplane_type": first_id(AirplaneType),
+     }, 3),
+    ("crews-list", "get", lambda: url("airport:crew-list"), None, 2),
+    ("crews-retrieve", "get",
+     lambda: url("airport:crew-detail", first_id(Crew)), None, 1),
+    ("crews-create", "post",
+     lambda: url("airport:crew-list"),
+     lambda: {"first_name": "Benchmark", "last_name": "Crew"}, 1),
+    ("countries-list", "get", lambda: url("airport:country-list"), None, 2),
+    ("countries-retrieve", "get",
+     lambda: url("airport:country-detail", first_id(Country)), None, 1),
+    ("countries-create", "post",
+     lambda: url("airport:country-list"),
+     lambda: {"name": f"Country benchmark {next(counter)}"}, 2),
+    ("locations-list", "get", lambda: url("airport:location-list"), None, 2),
+    ("locations-retrieve", "get",
+     lambda: url("airport:location-detail", first_id(Location)), None, 1),
+    ("locations-create", "post",
+     lambda: url("airport:location-list"),
+     lambda: {
+         "city": f"City benchmark {next(counter)}",
+         "country": first_id(Country),
+     }, 3),
+    ("airports-list", "get", lambda: url("airport:airport-list"), None, 2),
+    ("airports-list-city", "get",
+     lambda: url("airport:airport-list") + "?city=city", None, 3),
+    ("airports-retrieve", "get",
+     lambda: url("airport:airport-detail", first_id(Airport)), None, 1),
+    ("airports-create", "post",
+     lambda: url("airport:airport-list"),
+     lambda: {
+         "name": f"Airport benchmark {next(counter)}",
+         "location": first_id(Location),
+     }, 3),
+    ("routes-list", "get", lambda: url("airport:route-list"), None, 2),
+    ("routes-retrieve", "get",
+     lambda: url("airport:route-detail", first_id(Route)), None, 1),
+    ("routes-create", "post",
+     lambda: url("airport:route-list"), route_payload, 7),
+    ("flights-list", "get", lambda: url("airport:flight-list"), None, 3),
+    ("flights-list-flat", "get",
+     lambda: url("airport:flight-list") + "?projection=flat", None, 3),
+    ("flights-list-cursor", "get",
+     lambda: url("airport:flight-list") + "?pagination=cursor", None, 2),
+    ("flights-list-origin", "get",
+     lambda: url("airport:flight-list") + "?origin=city", None, 4),
+    ("flights-retrieve", "get",
+     lambda: url("airport:flight-detail", first_id(Flight)), None, 4),
+    ("flights-seat-map", "get",
+     lambda: url("airport:flight-seat-map", first_id(Flight)), None, 2),
+    ("flights-create", "post",
+     lambda: url("airport:flight-list"), flight_payload, 9),
+    ("flights-holds", "post", hold_url, hold_payload, 7),
+    ("flights-schedule", "post",
+     lambda: url("airport:flight-schedule"), schedule_payload, 7),
+    ("itineraries-list", "get",
+     lambda: url("airport:itinerary-list")
+     + "?origin=city&destination=city&date=2030-01-01", None, 7),
+    ("orders-list", "get", lambda: url("airport:order-list"), None, 3),
+    ("orders-retrieve", "get",
+     lambda: url(
+         "airport:order-detail",
+         first_id(Order.objects.filter(user__email="staff@airport.local")),
+     ), None, 2),
+    ("orders-create", "post",
+     lambda: url("airport:order-list"), free_seat_payload, 9),
+    ("exports-orders", "get",
+     lambda: url("airport:export-orders") + "?file_format=jsonl", None, 1),
+    ("metrics-list", "get", lambda: url("airport:metrics-list"), None, 0),
+    ("metrics-prometheus", "get",
+     lambda: url("airport:metrics-prometheus"), None, 0),
+    ("user-register", "post",
+     lambda: url("user:create"),
+     lambda: {
+         "email": f"benchmark{next(counter)}@airport.local",
+         "password": PASSWORD,
+     }, 2),
+    ("user-token", "post",
+     lambda: url("user:token_obtain_pair"),
+     lambda: {"email": "staff@airport.local", "password": PASSWORD}, 1),
+    ("user-me", "get", lambda: url("user:manage_user"), None, 0),
+)
+
+
+def percentile(timings: list[float], percent: int) -> float:
+    timings = sorted(timings)
+    index = max(0, round(percent / 100 * len(timings)) - 1)
+    return round(timings[index] * 1000, 3)
+
+
+# Repeated calls would hit the order creation and itinerary search rates.
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            scope: "1000000/day"
+            for scope in settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]
+        },
+    }
+)
+class EndpointBenchmarkTests(TestCase):
+    report = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="staff@airport.local",
+            password=PASSWORD,
+            is_staff=True,
+        )
+        seed_network(
+            countries=2 * BENCHMARK_SCALE,
+            locations_per_country=5,
+            routes=20 * BENCHMARK_SCALE,
+            airplanes=5 * BENCHMARK_SCALE,
+            crews=10 * BENCHMARK_SCALE,
+            flights=100 * BENCHMARK_SCALE,
+        )
+        seed_orders(
+            users=[cls.user, *seed_users(users=5 * BENCHMARK_SCALE)],
+            orders=50 * BENCHMARK_SCALE,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if BENCHMARK_REPORT:
+            with open(BENCHMARK_REPORT, "w") as report_file:
+                json.dump(
+                    {
+                        "scale": BENCHMARK_SCALE,
+                        "repeat": BENCHMARK_REPEAT,
+                        "endpoints": cls.report,
+                    },
+                    report_file,
+                    indent=2,
+                    sort_keys=True,
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_endpoints(self):
+        for name, method, get_url, get_payload, max_queries in ENDPOINTS:
+            with self.subTest(endpoint=name):
+                # Start every endpoint with a cold response cache
+                # and an empty throttle history.
+                cache.clear()
+                timings = []
+                queries = None
+                for _ in range(BENCHMARK_REPEAT):
+                    request_url = get_url()
+                    payload = get_payload() if get_payload else None
+                    with CaptureQueriesContext(connection) as context:
+                        start = time.perf_counter()
+                        res = getattr(self.client, method)(
+                            request_url,
+                            payload,
+                            format="json",
+                        )
+                        if res.streaming:
+                            # Streamed responses query while they are read.
+                            b"".join(res.streaming_content)
+                        timings.append(time.perf_counter() - start)
+                    if queries is None:
+                        queries = len(context.captured_queries)
+
+                    self.assertLess(
+                        res.status_code,
+                        300,
+                        getattr(res, "data", None),
+                    )
+
+                self.report[name] = {
+                    "queries": queries,
+                    "max_queries": max_queries,
+                    "p50_ms": percentile(timings, 50),
+                    "p90_ms": percentile(timings, 90),
+                    "p99_ms": percentile(timings, 99),
+                    "mean_ms": round(statistics.mean(timings) * 1000, 3),
+                }
+                self.assertLessEqual(queries, max_queries)
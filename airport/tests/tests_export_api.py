@@ -0,0 +1,126 @@
+import csv
+import datetime
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.exports import COLUMNS
+from airport.models import Order, Ticket
+from airport.tests.tests_flight_api import sample_flight_uk_portugal
+
+EXPORT_URL = reverse("airport:export-orders")
+
+
+class OrderExportApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            email="admin@email.com",
+            password="1qazcde3",
+            is_staff=True,
+        )
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com",
+            password="1qazcde3",
+        )
+        self.client.force_authenticate(self.admin)
+        self.flight = sample_flight_uk_portugal()
+
+        self.orders = []
+        for day in range(1, 4):
+            order = Order.objects.create(user=self.user)
+            Order.objects.filter(id=order.id).update(
+                created_at=datetime.datetime(
+                    2024, 9, day, 12, tzinfo=datetime.timezone.utc
+                )
+            )
+            Ticket.objects.bulk_create(
+                Ticket(order=order, flight=self.flight, row=day, seat=seat)
+                for seat in (1, 2)
+            )
+            self.orders.append(order)
+
+    def export(self, **params):
+        res = self.client.get(EXPORT_URL, params)
+        content = b"".join(res.streaming_content).decode()
+        return res, content
+
+    def test_export_csv(self):
+        res, content = self.export()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("orders.csv", res["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(list(rows[0]), list(COLUMNS))
+        order_id = str(self.orders[0].id)
+        self.assertEqual(
+            [(row["order_id"], row["row"], row["seat"]) for row in rows[:2]],
+            [(order_id, "1", "1"), (order_id, "1", "2")],
+        )
+        self.assertEqual(rows[0]["user_email"], "test@email.com")
+        self.assertEqual(rows[0]["created_at"], "2024-09-01T12:00:00+00:00")
+
+    def test_export_jsonl(self):
+        res, content = self.export(file_format="jsonl")
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[-1]["order_id"], self.orders[-1].id)
+        self.assertEqual(rows[-1]["flight_id"], self.flight.id)
+
+    def test_export_date_range(self):
+        res, content = self.export(
+            file_format="jsonl",
+            created_after="2024-09-02",
+            created_before="2024-09-03",
+        )
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(
+            {row["order_id"] for row in rows},
+            {self.orders[1].id},
+        )
+
+    def test_export_order_without_tickets(self):
+        Order.objects.create(user=self.user)
+
+        res, content = self.export(
+            file_format="jsonl",
+            created_after="2024-09-04",
+        )
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertIsNone(rows[0]["ticket_id"])
+
+    @override_settings(AIRPORT_EXPORT_CHUNK_SIZE=4)
+    def test_export_is_streamed_in_chunks(self):
+        res = self.client.get(EXPORT_URL)
+
+        # Header and 3 rows, then the last 3 rows.
+        self.assertEqual(len(list(res.streaming_content)), 2)
+
+    def test_invalid_range(self):
+        res = self.client.get(
+            EXPORT_URL,
+            {"created_after": "2024-09-03", "created_before": "2024-09-01"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_requires_admin(self):
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -12,8 +12,11 @@ from airport.models import (
     Crew,
     Flight,
     Location,
-    Route
+    Order,
+    Route,
+    Ticket,
 )
+from airport.seat_map import SeatMap
 
 from airport.serializers import (
     FlightListSerializer,
@@ -27,6 +30,10 @@ def detail_url(flight_id):
     return reverse("airport:flight-detail", args=(flight_id,))
 
 
+def seat_map_url(flight_id):
+    return reverse("airport:flight-seat-map", args=(flight_id,))
+
+
 def sample_airplane_type(**params) -> AirplaneType:
     defaults = {
         "name": "Test_airplane_type",
@@ -295,6 +302,99 @@ class AuthenticatedFlightApiTests(TestCase):
             serializer_filter_destination.data
         )
 
+    def test_filter_flights_by_city_match_mode(self):
+        flight_uk_pt = sample_flight_uk_portugal()
+        sample_flight_paris_rome()
+
+        res_prefix = self.client.get(
+            FLIGHT_URL,
+            {"origin": "lon", "city_match": "prefix"},
+        )
+        res_exact = self.client.get(
+            FLIGHT_URL,
+            {"origin": "lon", "city_match": "exact"},
+        )
+        res_invalid = self.client.get(
+            FLIGHT_URL,
+            {"origin": "lon", "city_match": "regex"},
+        )
+
+        self.assertEqual(
+            [flight["id"] for flight in res_prefix.data["results"]],
+            [flight_uk_pt.id],
+        )
+        self.assertEqual(res_exact.data["results"], [])
+        self.assertEqual(
+            res_invalid.status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_filter_flights_by_departure_time(self):
+        flight_uk_pt = sample_flight_uk_portugal()
+        flight_fr_it = sample_flight_paris_rome()
+
+        res_date = self.client.get(FLIGHT_URL, {"date": "2022-08-03"})
+        res_window = self.client.get(
+            FLIGHT_URL,
+            {
+                "departure_after": "2022-06-01",
+                "departure_before": "2022-06-02T14:00:01Z",
+            },
+        )
+        res_invalid = self.client.get(FLIGHT_URL, {"date": "tomorrow"})
+
+        self.assertEqual(
+            [flight["id"] for flight in res_date.data["results"]],
+            [flight_fr_it.id],
+        )
+        self.assertEqual(
+            [flight["id"] for flight in res_window.data["results"]],
+            [flight_uk_pt.id],
+        )
+        self.assertEqual(
+            res_invalid.status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_list_flights_flat_projection(self):
+        flight = sample_flight_uk_portugal()
+        sample_flight_paris_rome()
+
+        # The flights, their count and the last expired seat hold.
+        with self.assertNumQueries(3):
+            res = self.client.get(FLIGHT_URL, {"projection": "flat"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"][0],
+            {
+                "id": flight.id,
+                "origin_city": "London",
+                "destination_city": "Porto",
+                "airplane_name": "Airbus A321 Neo",
+                "airplane_type": "Airbus Airplane",
+                "departure_time": "2022-06-02T14:00:00Z",
+                "arrival_time": "2022-06-02T22:00:00Z",
+                "capacity": 54 * 6,
+                "seats_available": 54 * 6,
+            },
+        )
+
+    def test_list_flights_with_cursor_pagination(self):
+        sample_flight_uk_portugal()
+        sample_flight_paris_rome()
+
+        res = self.client.get(FLIGHT_URL, {"pagination": "cursor"})
+        flights = Flight.objects.order_by("departure_time", "id")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.data)
+        self.assertIsNone(res.data["next"])
+        self.assertEqual(
+            [flight["id"] for flight in res.data["results"]],
+            [flight.id for flight in flights],
+        )
+
     def test_retrieve_flight_details(self):
         sample_flight_uk_portugal()
         flight = sample_flight_paris_rome()
@@ -307,6 +407,107 @@ class AuthenticatedFlightApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_list_flights_not_modified(self):
+        sample_flight_uk_portugal()
+
+        res = self.client.get(FLIGHT_URL)
+        # Only the last expired seat hold.
+        with self.assertNumQueries(1):
+            res_not_modified = self.client.get(
+                FLIGHT_URL,
+                HTTP_IF_NONE_MATCH=res["ETag"],
+            )
+        sample_flight_paris_rome()
+        res_modified = self.client.get(
+            FLIGHT_URL,
+            HTTP_IF_NONE_MATCH=res["ETag"],
+        )
+
+        self.assertTrue(res["ETag"].startswith("W/"))
+        self.assertEqual(
+            res_not_modified.status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(res_modified.status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since_is_not_answered(self):
+        sample_flight_uk_portugal()
+        res = self.client.get(FLIGHT_URL)
+        # A write in the same second keeps the Last-Modified of the list.
+        sample_flight_paris_rome()
+
+        res_modified = self.client.get(
+            FLIGHT_URL,
+            HTTP_IF_MODIFIED_SINCE=res["Last-Modified"],
+        )
+
+        self.assertEqual(res_modified.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res_modified.data["results"]), 2)
+
+    def test_retrieve_flight_not_modified_until_booked(self):
+        flight = sample_flight_paris_rome()
+        url = detail_url(flight_id=flight.id)
+
+        res = self.client.get(url)
+        res_not_modified = self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=res["ETag"],
+        )
+        self.client.post(
+            reverse("airport:order-list"),
+            {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]},
+            format="json",
+        )
+        res_modified = self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=res["ETag"],
+        )
+
+        self.assertEqual(
+            res_not_modified.status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+        self.assertEqual(res_modified.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res_modified.data["taken_seats"]), 1)
+
+    def test_retrieve_flight_seat_map(self):
+        flight = sample_flight_paris_rome()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=flight, order=order)
+        Ticket.objects.create(row=2, seat=3, flight=flight, order=order)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(seat_map_url(flight.id))
+
+        seat_map = SeatMap(flight.airplane.rows, flight.airplane.seats_in_row)
+        seat_map.take(1, 1)
+        seat_map.take(2, 3)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["seats_available"], seat_map.capacity - 2)
+        self.assertEqual(res.data["taken_seats"], seat_map.packed)
+        self.assertTrue(seat_map.is_taken(2, 3))
+        self.assertFalse(seat_map.is_taken(3, 2))
+
+    def test_seat_map_skips_seats_out_of_range(self):
+        flight = sample_flight_paris_rome()
+        airplane = flight.airplane
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=airplane.rows,
+            seat=airplane.seats_in_row,
+            flight=flight,
+            order=order,
+        )
+        airplane.rows = 1
+        airplane.save()
+
+        res = self.client.get(seat_map_url(flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["seats_available"], airplane.capacity)
+        self.assertEqual(res.data["seats_out_of_range"], 1)
+
     def test_create_flight(self):
         payload = {
             "airplane": sample_airplane().id,
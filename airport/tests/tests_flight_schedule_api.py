@@ -0,0 +1,313 @@
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Flight
+from airport.tests.tests_flight_api import (
+    sample_crew,
+    sample_flight_uk_portugal,
+)
+
+SCHEDULE_URL = reverse("airport:flight-schedule")
+
+
+class FlightScheduleTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@email.com",
+            password="1qazcde3",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+        flight = sample_flight_uk_portugal()
+        self.airplane = flight.airplane
+        self.route = flight.route
+        self.crew = [
+            sample_crew(first_name="Anna"),
+            sample_crew(first_name="Bob"),
+        ]
+        Flight.objects.all().delete()
+
+    def flight_row(self, day=1, **params):
+        row = {
+            "airplane": self.airplane.id,
+            "route": self.route.id,
+            "crew": [crew.id for crew in self.crew],
+            "departure_time": f"2025-06-{day:02}T08:00:00+00:00",
+            "arrival_time": f"2025-06-{day:02}T10:30:00+00:00",
+        }
+        row.update(params)
+        return row
+
+
+class FlightScheduleApiTests(FlightScheduleTestCase):
+    def test_schedule_flights(self):
+        res = self.client.post(
+            SCHEDULE_URL,
+            {"flights": [self.flight_row(day) for day in range(1, 31)]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created"], 30)
+        self.assertEqual(Flight.objects.count(), 30)
+        self.assertEqual(Flight.crew.through.objects.count(), 60)
+        flight = Flight.objects.first()
+        self.assertEqual(
+            flight.departure_time,
+            datetime.datetime(2025, 6, 1, 8, tzinfo=datetime.timezone.utc),
+        )
+        self.assertEqual(set(flight.crew.all()), set(self.crew))
+
+    def test_schedule_flights_with_few_queries(self):
+        flights = [self.flight_row(day) for day in range(1, 31)]
+
+        with self.assertNumQueries(7):
+            res = self.client.post(
+                SCHEDULE_URL,
+                {"flights": flights},
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_errors_are_reported_by_row(self):
+        res = self.client.post(
+            SCHEDULE_URL,
+            {
+                "flights": [
+                    self.flight_row(1),
+                    self.flight_row(2, airplane=0, crew=[self.crew[0].id, 0]),
+                    self.flight_row(3, arrival_time="2025-06-02T10:00"),
+                    self.flight_row(4, departure_time="tomorrow"),
+                    {"route": self.route.id},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["valid"], 1)
+        self.assertEqual(
+            [error["row"] for error in res.data["errors"]],
+            [2, 3, 4, 5],
+        )
+        self.assertEqual(
+            set(res.data["errors"][0]["errors"]),
+            {"airplane", "crew"},
+        )
+        self.assertEqual(
+            set(res.data["errors"][1]["errors"]),
+            {"departure_time", "arrival_time"},
+        )
+        self.assertEqual(
+            res.data["errors"][1]["errors"]["arrival_time"],
+            ["Departure time cannot be later than arrival time."],
+        )
+        self.assertEqual(
+            res.data["errors"][0]["errors"]["airplane"],
+            ['Invalid pk "0" - object does not exist.'],
+        )
+        self.assertEqual(
+            set(res.data["errors"][3]["errors"]),
+            {"airplane", "departure_time", "arrival_time"},
+        )
+        self.assertFalse(Flight.objects.exists())
+
+    def test_dry_run(self):
+        res = self.client.post(
+            SCHEDULE_URL,
+            {"flights": [self.flight_row()], "dry_run": True},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["valid"], 1)
+        self.assertFalse(Flight.objects.exists())
+
+    def test_schedule_pattern(self):
+        res = self.client.post(
+            SCHEDULE_URL,
+            {
+                "pattern": {
+                    "airplane": self.airplane.id,
+                    "route": self.route.id,
+                    "crew": [self.crew[0].id],
+                    "first_date": "2025-06-02",
+                    "last_date": "2025-06-15",
+                    "weekdays": [1, 5],
+                    "departure_time": "08:30",
+                    "duration": 150,
+                }
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        departures = [
+            timezone.localtime(flight.departure_time)
+            for flight in Flight.objects.all()
+        ]
+        self.assertEqual(
+            [departure.date().isoformat() for departure in departures],
+            ["2025-06-02", "2025-06-06", "2025-06-09", "2025-06-13"],
+        )
+        self.assertEqual(departures[0].time(), datetime.time(8, 30))
+        flight = Flight.objects.first()
+        self.assertEqual(
+            flight.arrival_time - flight.departure_time,
+            datetime.timedelta(minutes=150),
+        )
+
+    def test_invalid_pattern(self):
+        res = self.client.post(
+            SCHEDULE_URL,
+            {
+                "pattern": {
+                    "airplane": self.airplane.id,
+                    "route": self.route.id,
+                    "first_date": "2025-06-15",
+                    "last_date": "2025-06-02",
+                    "weekdays": [8],
+                    "departure_time": "08:30",
+                    "duration": 150,
+                }
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("weekdays", res.data["pattern"])
+
+    def test_schedule_csv_file(self):
+        content = (
+            "airplane,route,crew,departure_time,arrival_time\n"
+            f"{self.airplane.id},{self.route.id},"
+            f"{self.crew[0].id};{self.crew[1].id},"
+            "2025-06-01T08:00,2025-06-01T10:30\n"
+            f"{self.airplane.id},{self.route.id},,"
+            "2025-06-02T08:00,2025-06-02T10:30\n"
+        )
+
+        res = self.client.post(
+            SCHEDULE_URL,
+            {"upload": SimpleUploadedFile("timetable.csv", content.encode())},
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(Flight.crew.through.objects.count(), 2)
+
+    def test_schedule_jsonl_file(self):
+        content = "\n".join(
+            [json.dumps(self.flight_row(1)), "not json", ""]
+        )
+
+        res = self.client.post(
+            SCHEDULE_URL,
+            {
+                "upload": SimpleUploadedFile(
+                    "timetable.jsonl", content.encode()
+                )
+            },
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["errors"][0]["row"], 2)
+        self.assertIn("non_field_errors", res.data["errors"][0]["errors"])
+
+    def test_exactly_one_source(self):
+        res = self.client.post(SCHEDULE_URL, {}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(
+            SCHEDULE_URL,
+            {"upload": SimpleUploadedFile("timetable.xlsx", b"")},
+            format="multipart",
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("upload", res.data)
+
+    def test_schedule_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@email.com",
+                password="1qazcde3",
+            )
+        )
+
+        res = self.client.post(
+            SCHEDULE_URL,
+            {"flights": [self.flight_row()]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ScheduleFlightsCommandTests(FlightScheduleTestCase):
+    def call(self, *args):
+        out = StringIO()
+        call_command("schedule_flights", *args, stdout=out)
+        return out.getvalue()
+
+    def test_command_schedules_file(self):
+        with tempfile.NamedTemporaryFile(
+                "w", suffix=".jsonl", delete=False
+        ) as timetable_file:
+            for day in range(1, 11):
+                timetable_file.write(json.dumps(self.flight_row(day)) + "\n")
+        self.addCleanup(os.remove, timetable_file.name)
+
+        out = self.call("--file", timetable_file.name, "--batch_size", "3")
+
+        self.assertIn("Scheduled 10 flights", out)
+        self.assertEqual(Flight.objects.count(), 10)
+        self.assertEqual(Flight.crew.through.objects.count(), 20)
+
+    def test_command_reports_errors(self):
+        with tempfile.NamedTemporaryFile(
+                "w", suffix=".jsonl", delete=False
+        ) as timetable_file:
+            timetable_file.write(
+                json.dumps(self.flight_row(1, route=0)) + "\n"
+            )
+        self.addCleanup(os.remove, timetable_file.name)
+
+        with self.assertRaisesMessage(
+                CommandError,
+                "1 rows have errors, no flights were scheduled",
+        ):
+            self.call("--file", timetable_file.name)
+        self.assertFalse(Flight.objects.exists())
+
+    def test_command_schedules_pattern(self):
+        out = self.call(
+            "--airplane", str(self.airplane.id),
+            "--route", str(self.route.id),
+            "--crew", str(self.crew[0].id),
+            "--first_date", "2025-06-01",
+            "--last_date", "2025-06-30",
+            "--weekdays", "6", "7",
+            "--departure_time", "20:15",
+            "--duration", "95",
+        )
+
+        self.assertIn("Scheduled 9 flights", out)
+        self.assertEqual(Flight.objects.count(), 9)
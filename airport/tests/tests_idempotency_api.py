@@ -0,0 +1,123 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import IdempotencyKey, Order, Ticket
+from airport.tests.tests_flight_api import sample_flight_uk_portugal
+
+ORDER_URL = reverse("airport:order-list")
+
+
+class IdempotentOrderApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com",
+            password="1qazcde3",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight_uk_portugal()
+
+    def post_order(self, key, seat=1, row=1):
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                ]
+            },
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_first_response(self):
+        res = self.post_order("order-1")
+        retry = self.post_order("order-1")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, res.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_replay_does_not_touch_tickets(self):
+        self.post_order("order-1")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.post_order("order-1")
+
+        self.assertFalse(
+            [
+                query["sql"] for query in queries
+                if "airport_ticket" in query["sql"]
+                or "airport_order" in query["sql"]
+            ]
+        )
+
+    def test_key_reused_with_other_body(self):
+        self.post_order("order-1")
+
+        res = self.post_order("order-1", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        self.post_order("order-1")
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="other@email.com",
+                password="1qazcde3",
+            )
+        )
+
+        res = self.post_order("order-1", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_failed_request_is_not_stored(self):
+        res = self.post_order("order-1", row=100)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        res = self.post_order("order-1")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_too_long_key(self):
+        res = self.post_order("k" * 256)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    @override_settings(AIRPORT_IDEMPOTENCY_KEY_SECONDS=0)
+    def test_expired_key_creates_new_order(self):
+        self.post_order("order-1")
+
+        res = self.post_order("order-1", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_purge_idempotency_keys(self):
+        self.post_order("order-1")
+        self.post_order("order-2", seat=2)
+
+        out = StringIO()
+        with override_settings(AIRPORT_IDEMPOTENCY_KEY_SECONDS=0):
+            call_command("purge_idempotency_keys", stdout=out)
+
+        self.assertIn("Deleted 2 expired idempotency keys", out.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Airport, Flight, Location, Route
+from airport.tests.tests_flight_api import sample_flight_uk_portugal
+
+ITINERARY_URL = reverse("airport:itinerary-list")
+
+
+def sample_route_porto_rome(flight_uk_pt: Flight) -> Route:
+    porto = flight_uk_pt.route.destination
+    rome = Airport.objects.create(
+        name="Fiumicino",
+        location=Location.objects.create(
+            city="Rome",
+            country=porto.location.country,
+        ),
+    )
+    return Route.objects.create(
+        origin=porto,
+        destination=rome,
+        distance=1700,
+    )
+
+
+class AuthenticatedItineraryApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com",
+            password="1qazcde3",
+            is_staff=False,
+        )
+        self.client.force_authenticate(self.user)
+        self.flight_uk_pt = sample_flight_uk_portugal()
+        self.route_pt_it = sample_route_porto_rome(self.flight_uk_pt)
+
+    def sample_connection(self, departure_time, arrival_time) -> Flight:
+        return Flight.objects.create(
+            airplane=self.flight_uk_pt.airplane,
+            route=self.route_pt_it,
+            departure_time=departure_time,
+            arrival_time=arrival_time,
+        )
+
+    def test_search_connecting_itinerary(self):
+        connection = self.sample_connection(
+            "2022-06-02T23:30:00Z",
+            "2022-06-03T02:00:00Z",
+        )
+        self.sample_connection(
+            "2022-06-03T10:00:00Z",
+            "2022-06-03T12:30:00Z",
+        )
+
+        res = self.client.get(
+            ITINERARY_URL,
+            {"origin": "London", "destination": "Rome", "date": "2022-06-02"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(
+            [leg["flight"] for leg in res.data[0]["legs"]],
+            [self.flight_uk_pt.id, connection.id],
+        )
+        self.assertEqual(res.data[0]["distance"], 1380 + 1700)
+
+    def test_search_respects_max_legs(self):
+        self.sample_connection(
+            "2022-06-02T23:30:00Z",
+            "2022-06-03T02:00:00Z",
+        )
+
+        res = self.client.get(
+            ITINERARY_URL,
+            {
+                "origin": "London",
+                "destination": "Rome",
+                "date": "2022-06-02",
+                "max_legs": 1,
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [])
+
+    def test_search_requires_date(self):
+        res = self.client.get(
+            ITINERARY_URL,
+            {"origin": "London", "destination": "Rome"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,186 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.instrumentation import registry
+from airport.metrics import ORDERS_CREATED
+from airport.tests.tests_flight_api import sample_flight_uk_portugal
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+TOKEN_URL = reverse("user:token_obtain_pair")
+METRICS_URL = reverse("airport:metrics-list")
+PROMETHEUS_URL = reverse("airport:metrics-prometheus")
+
+
+def sample_value(exposition: str, sample: str) -> float:
+    for line in exposition.splitlines():
+        name, _, value = line.rpartition(" ")
+        if name == sample:
+            return float(value)
+    return 0.0
+
+
+@override_settings(AIRPORT_INSTRUMENTATION=True)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@email.com",
+            password="1qazcde3",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+        sample_flight_uk_portugal()
+
+    def test_server_timing_header_and_log_line(self):
+        with self.assertLogs("airport.requests", "INFO") as logs:
+            res = self.client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertRegex(
+            res["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="3 queries", '
+            r"serializer;dur=[\d.]+, total;dur=[\d.]+$",
+        )
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "GET airport:flight-list")
+        self.assertEqual(line["status"], status.HTTP_200_OK)
+        self.assertEqual(line["queries"], 3)
+        self.assertGreater(line["serializer_ms"], 0)
+
+    def test_metrics_aggregate_per_view(self):
+        with self.assertLogs("airport.requests", "INFO"):
+            self.client.get(FLIGHT_URL)
+            self.client.get(FLIGHT_URL)
+            res = self.client.get(METRICS_URL)
+
+        self.assertTrue(res.data["enabled"])
+        flights = res.data["views"]["GET airport:flight-list"]
+        self.assertEqual(flights["total_ms"]["count"], 2)
+        self.assertEqual(flights["queries"]["buckets"]["5"], 2)
+        self.assertEqual(flights["queries"]["sum"], 6)
+
+    def test_metrics_admin_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@email.com",
+                password="1qazcde3",
+            )
+        )
+
+        with self.assertLogs("airport.requests", "INFO"):
+            res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class DisabledInstrumentationTests(TestCase):
+    def test_no_server_timing_header(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@email.com",
+                password="1qazcde3",
+            )
+        )
+
+        res = client.get(FLIGHT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Server-Timing", res)
+
+
+class PrometheusMetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@email.com",
+            password="1qazcde3",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight_uk_portugal()
+
+    def scrape(self) -> str:
+        res = self.client.get(PROMETHEUS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        return res.content.decode()
+
+    def test_bookings_and_seat_conflicts_are_counted(self):
+        before = self.scrape()
+        payload = {
+            "tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]
+        }
+
+        self.client.post(ORDER_URL, payload, format="json")
+        self.client.post(ORDER_URL, payload, format="json")
+        self.client.get(FLIGHT_URL)
+        after = self.scrape()
+
+        for sample, delta in (
+            ("airport_orders_created_total", 1),
+            ("airport_tickets_sold_total", 1),
+            ("airport_order_create_seconds_count", 2),
+            ('airport_seat_conflicts_total{stage="lock"}', 1),
+            ('airport_flight_request_seconds_count{action="list"}', 1),
+        ):
+            with self.subTest(sample=sample):
+                self.assertEqual(
+                    sample_value(after, sample) - sample_value(before, sample),
+                    delta,
+                )
+
+    def test_token_outcomes_are_counted(self):
+        before = self.scrape()
+
+        self.client.post(
+            TOKEN_URL,
+            {"email": "admin@email.com", "password": "1qazcde3"},
+        )
+        self.client.post(
+            TOKEN_URL,
+            {"email": "admin@email.com", "password": "wrong"},
+        )
+        after = self.scrape()
+
+        for outcome in ("issued", "rejected"):
+            sample = f'airport_tokens_issued_total{{outcome="{outcome}"}}'
+            self.assertEqual(
+                sample_value(after, sample) - sample_value(before, sample),
+                1,
+            )
+
+    def test_values_of_all_processes_are_summed(self):
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            with override_settings(AIRPORT_METRICS_DIR=metrics_dir):
+                own = sample_value(
+                    self.scrape(),
+                    "airport_orders_created_total",
+                )
+                with open(os.path.join(metrics_dir, "1.json"), "w") as file:
+                    json.dump(
+                        {ORDERS_CREATED.name: [[[], 5]], "unknown": []},
+                        file,
+                    )
+
+                self.assertEqual(
+                    sample_value(
+                        self.scrape(),
+                        "airport_orders_created_total",
+                    ),
+                    own + 5,
+                )
+                self.assertTrue(
+                    os.path.exists(
+                        os.path.join(metrics_dir, f"{os.getpid()}.json")
+                    )
+                )
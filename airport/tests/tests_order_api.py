@@ -0,0 +1,202 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.cache import generation_key, get_cache
+from airport.models import Flight, Order, Ticket
+from airport.tests.tests_flight_api import (
+    sample_flight_paris_rome,
+    sample_flight_uk_portugal,
+)
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def detail_url(order_id):
+    return reverse("airport:order-detail", args=(order_id,))
+
+
+class AuthenticatedOrderApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com",
+            password="1qazcde3",
+            is_staff=False,
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight_uk_portugal()
+
+    def test_create_order_with_several_tickets(self):
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": seat, "flight": self.flight.id}
+                for seat in range(1, 7)
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.filter(flight=self.flight).count(), 6)
+
+    def test_create_order_queries_do_not_grow_with_tickets(self):
+        other_flight = sample_flight_paris_rome()
+        payload = {
+            "tickets": [
+                {"row": row, "seat": seat, "flight": flight.id}
+                for flight in (self.flight, other_flight)
+                for row in range(1, 4)
+                for seat in range(1, 4)
+            ]
+        }
+        with self.assertNumQueries(11):
+            res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.count(), 18)
+
+    def test_create_order_with_taken_seats_is_a_conflict(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=2, seat=3, flight=self.flight, order=order)
+
+        payload = {
+            "tickets": [
+                {"row": 2, "seat": 2, "flight": self.flight.id},
+                {"row": 2, "seat": 3, "flight": self.flight.id},
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"flight": self.flight.id, "row": 2, "seat": 3}],
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_create_order_reports_repeated_seats_per_ticket(self):
+        payload = {
+            "tickets": [
+                {"row": 2, "seat": 2, "flight": self.flight.id},
+                {"row": 2, "seat": 3, "flight": self.flight.id},
+                {"row": 2, "seat": 2, "flight": self.flight.id},
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = res.data["tickets"]
+        self.assertEqual(errors[:2], [{}, {}])
+        self.assertIn("seat", errors[2])
+        self.assertFalse(Order.objects.exists())
+
+    def test_seat_sold_after_the_check_is_a_conflict(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=2, seat=3, flight=self.flight, order=order)
+        payload = {
+            "tickets": [{"row": 2, "seat": 3, "flight": self.flight.id}]
+        }
+        taken_seats = Ticket.taken_seats
+
+        def miss_taken_seats(*args):
+            # As if the seat was sold without the lock after the check,
+            # found by the unique constraint.
+            Ticket.taken_seats = taken_seats
+            return []
+
+        Ticket.taken_seats = staticmethod(miss_taken_seats)
+        try:
+            res = self.client.post(ORDER_URL, payload, format="json")
+        finally:
+            Ticket.taken_seats = taken_seats
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"flight": self.flight.id, "row": 2, "seat": 3}],
+        )
+
+    def test_create_order_with_seat_outside_airplane(self):
+        payload = {
+            "tickets": [
+                {"row": 100, "seat": 1, "flight": self.flight.id},
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_create_and_delete_order_update_tickets_sold(self):
+        payload = {
+            "tickets": [
+                {"row": 3, "seat": seat, "flight": self.flight.id}
+                for seat in range(1, 4)
+            ]
+        }
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.tickets_sold, 3)
+
+        res = self.client.delete(detail_url(res.data["id"]))
+        self.flight.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.flight.tickets_sold, 0)
+
+    def test_reconcile_tickets_sold(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=order)
+        updated_at = self.flight.updated_at
+
+        out = StringIO()
+        call_command("reconcile_tickets_sold", stdout=out)
+        self.flight.refresh_from_db()
+
+        self.assertIn(f"Flight {self.flight.id}", out.getvalue())
+        self.assertEqual(self.flight.tickets_sold, 2)
+        self.assertGreater(self.flight.updated_at, updated_at)
+
+    def test_reconcile_tickets_sold_locks_drifted_flights(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+
+        with mock.patch(
+                "airport.management.commands.reconcile_tickets_sold"
+                ".lock_flights"
+        ) as lock_flights:
+            call_command("reconcile_tickets_sold", stdout=StringIO())
+
+        lock_flights.assert_called_once_with([self.flight.id])
+
+    def test_reconcile_tickets_sold_without_drift_keeps_generation(self):
+        generation = get_cache().get(generation_key(Flight))
+
+        out = StringIO()
+        call_command("reconcile_tickets_sold", stdout=out)
+
+        self.assertIn("0 flights corrected", out.getvalue())
+        self.assertEqual(
+            get_cache().get(generation_key(Flight)),
+            generation,
+        )
+
+    def test_list_orders_with_cursor_pagination(self):
+        for _ in range(12):
+            Order.objects.create(user=self.user)
+
+        res = self.client.get(ORDER_URL, {"pagination": "cursor"})
+        next_res = self.client.get(res.data["next"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 10)
+        self.assertEqual(len(next_res.data["results"]), 2)
+        self.assertIsNone(next_res.data["next"])
@@ -0,0 +1,96 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from user import hashers
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+REGISTER_URL = reverse("user:create")
+
+
+class PasswordHashingApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def login(self, password="1qazcde3"):
+        return self.client.post(
+            TOKEN_URL,
+            {"email": "test@email.com", "password": password},
+        )
+
+    def test_new_passwords_use_preferred_hasher(self):
+        res = self.client.post(
+            REGISTER_URL,
+            {"email": "test@email.com", "password": "1qazcde3"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        user = get_user_model().objects.get(email="test@email.com")
+        self.assertTrue(user.password.startswith("argon2$"))
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        get_user_model().objects.create(
+            email="test@email.com",
+            password=make_password("1qazcde3", hasher="pbkdf2_sha256"),
+        )
+
+        res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user = get_user_model().objects.get(email="test@email.com")
+        self.assertTrue(user.password.startswith("argon2$"))
+        self.assertTrue(user.check_password("1qazcde3"))
+
+    def test_hash_is_upgraded_when_parameters_change(self):
+        get_user_model().objects.create_user(
+            email="test@email.com",
+            password="1qazcde3",
+        )
+
+        with override_settings(PASSWORD_ARGON2_TIME_COST=3):
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user = get_user_model().objects.get(email="test@email.com")
+        self.assertIn("t=3", user.password)
+
+    def test_failed_login_keeps_legacy_hash(self):
+        legacy = make_password("1qazcde3", hasher="pbkdf2_sha256")
+        get_user_model().objects.create(
+            email="test@email.com",
+            password=legacy,
+        )
+
+        res = self.login(password="wrong-password")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        user = get_user_model().objects.get(email="test@email.com")
+        self.assertEqual(user.password, legacy)
+
+    def test_hashing_runs_on_pool_threads(self):
+        thread_names = []
+        encode = hashers.hashers.Argon2PasswordHasher.encode
+
+        def recording_encode(hasher, *args, **kwargs):
+            thread_names.append(threading.current_thread().name)
+            return encode(hasher, *args, **kwargs)
+
+        with mock.patch.object(
+            hashers.hashers.Argon2PasswordHasher,
+            "encode",
+            recording_encode,
+        ):
+            make_password("1qazcde3")
+
+        self.assertEqual(len(thread_names), 1)
+        self.assertTrue(
+            thread_names[0].startswith(hashers.THREAD_NAME_PREFIX)
+        )
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Country, Location
+
+COUNTRY_URL = reverse("airport:country-list")
+LOCATION_URL = reverse("airport:location-list")
+
+
+class CachedReferenceApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com",
+            password="1qazcde3",
+            is_staff=False,
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_is_served_from_cache(self):
+        Country.objects.create(name="Portugal")
+
+        res = self.client.get(COUNTRY_URL)
+        with self.assertNumQueries(0):
+            cached_res = self.client.get(COUNTRY_URL)
+
+        self.assertEqual(cached_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached_res.data, res.data)
+
+    def test_write_invalidates_cached_list(self):
+        country = Country.objects.create(name="Portugal")
+        Location.objects.create(city="Porto", country=country)
+        self.client.get(LOCATION_URL)
+
+        country.name = "Portuguese Republic"
+        country.save()
+        res = self.client.get(LOCATION_URL)
+
+        self.assertEqual(
+            res.data["results"][0]["country"],
+            "Portuguese Republic"
+        )
+
+    def test_query_params_are_part_of_cache_key(self):
+        for name in ("France", "Italy", "Portugal"):
+            Country.objects.create(name=name)
+
+        res_first = self.client.get(COUNTRY_URL, {"limit": 1})
+        res_second = self.client.get(COUNTRY_URL, {"limit": 1, "offset": 1})
+
+        self.assertNotEqual(
+            res_first.data["results"],
+            res_second.data["results"]
+        )
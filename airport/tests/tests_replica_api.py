@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport import replicas
+from airport.models import Country
+from airport.tests.tests_flight_api import (
+    FLIGHT_URL,
+    sample_flight_uk_portugal,
+    seat_map_url,
+)
+from airport.tests.tests_reference_api import COUNTRY_URL
+
+ORDER_URL = reverse("airport:order-list")
+REPLICA = "replica_test"
+
+# A second connection to the test database, set up by the test runner
+# as a mirror of the default one, so rows are visible on both and
+# queries can be told apart.
+connections.settings[REPLICA] = {
+    **connections["default"].settings_dict,
+    "TEST": {
+        **connections["default"].settings_dict["TEST"],
+        "MIRROR": "default",
+    },
+}
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    TransactionTestCase commits, the replica connection
+    could not see rows of a TestCase transaction.
+    """
+
+    databases = {"default", REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        replicas._unavailable_until.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com",
+            password="1qazcde3",
+            is_staff=False,
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight_uk_portugal()
+
+    def get_counting_queries(self, url):
+        with (
+            CaptureQueriesContext(connections["default"]) as primary,
+            CaptureQueriesContext(connections[REPLICA]) as replica,
+        ):
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(primary), len(replica)
+
+    @override_settings(AIRPORT_READ_YOUR_WRITES_SECONDS=0)
+    def test_safe_requests_read_from_replica(self):
+        primary, replica = self.get_counting_queries(FLIGHT_URL)
+
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    @override_settings(AIRPORT_READ_YOUR_WRITES_SECONDS=0)
+    def test_replica_is_chosen_once_per_request(self):
+        with mock.patch.object(
+                replicas,
+                "available_replica",
+                wraps=replicas.available_replica,
+        ) as available_replica:
+            self.get_counting_queries(FLIGHT_URL)
+
+        available_replica.assert_called_once_with()
+
+    def test_recently_written_rows_are_read_from_primary(self):
+        # The flight and the country were just written, a replica may
+        # not have them and its response would be cached or tagged with
+        # their new generation.
+        Country.objects.create(name="Spain")
+
+        primary, replica = self.get_counting_queries(COUNTRY_URL)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        # Only the last expired seat hold of the ETag is read from the
+        # replica, the flights come from the primary.
+        primary, replica = self.get_counting_queries(FLIGHT_URL)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 1)
+
+    def test_user_is_pinned_to_primary_after_order(self):
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        primary, replica = self.get_counting_queries(
+            seat_map_url(self.flight.id)
+        )
+
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_unavailable_replica_falls_back_to_primary(self):
+        replica = connections[REPLICA]
+        settings_dict = replica.settings_dict
+        replica.settings_dict = {
+            **settings_dict,
+            "NAME": "/nonexistent/airport.sqlite3",
+        }
+        replica.close()
+        try:
+            with CaptureQueriesContext(connections["default"]) as primary:
+                res = self.client.get(FLIGHT_URL)
+        finally:
+            replica.close()
+            replica.settings_dict = settings_dict
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertGreater(len(primary), 0)
+        self.assertIn(REPLICA, replicas._unavailable_until)
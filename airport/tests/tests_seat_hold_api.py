@@ -0,0 +1,194 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import SeatHold
+from airport.seat_map import SeatMap
+from airport.tests.tests_flight_api import (
+    FLIGHT_URL,
+    detail_url,
+    sample_flight_uk_portugal,
+)
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def holds_url(flight_id):
+    return reverse("airport:flight-holds", args=(flight_id,))
+
+
+class SeatHoldApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com",
+            password="1qazcde3",
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@email.com",
+            password="1qazcde3",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight_uk_portugal()
+
+    def hold(self, *seats):
+        return self.client.post(
+            holds_url(self.flight.id),
+            {"seats": [{"row": row, "seat": seat} for row, seat in seats]},
+            format="json",
+        )
+
+    def book(self, *seats):
+        return self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for row, seat in seats
+                ]
+            },
+            format="json",
+        )
+
+    def hold_for_other_user(self, *seats, seconds=600):
+        SeatHold.objects.bulk_create(
+            SeatHold(
+                flight=self.flight,
+                user=self.other_user,
+                row=row,
+                seat=seat,
+                expires_at=timezone.now()
+                + datetime.timedelta(seconds=seconds),
+            )
+            for row, seat in seats
+        )
+
+    def test_hold_seats(self):
+        res = self.hold((1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn("expires_at", res.data)
+        self.assertEqual(
+            set(self.flight.holds.values_list("row", "seat")),
+            {(1, 1), (1, 2)},
+        )
+
+    def test_held_seats_are_not_available(self):
+        self.book((2, 1))
+        self.hold_for_other_user((1, 1), (1, 2))
+
+        res = self.client.get(FLIGHT_URL)
+        self.assertEqual(
+            res.data["results"][0]["seats_available"],
+            self.flight.airplane.capacity - 3,
+        )
+
+        res = self.client.get(detail_url(self.flight.id))
+        self.assertEqual(
+            res.data["taken_seats"],
+            ["row: 1, seat: 1", "row: 1, seat: 2", "row: 2, seat: 1"],
+        )
+
+        seat_map = SeatMap.for_flight(self.flight)
+        self.assertTrue(seat_map.is_taken(1, 2))
+        self.assertFalse(seat_map.is_taken(1, 3))
+
+    def test_flight_list_changes_when_hold_expires(self):
+        self.hold((1, 1))
+        res = self.client.get(FLIGHT_URL)
+        seats_available = res.data["results"][0]["seats_available"]
+
+        SeatHold.objects.update(expires_at=timezone.now())
+        res_expired = self.client.get(
+            FLIGHT_URL,
+            HTTP_IF_NONE_MATCH=res["ETag"],
+        )
+
+        self.assertEqual(res_expired.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res_expired.data["results"][0]["seats_available"],
+            seats_available + 1,
+        )
+
+    def test_seat_held_by_other_user_is_a_conflict(self):
+        self.hold_for_other_user((1, 1))
+
+        res = self.book((1, 1), (1, 2))
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"flight": self.flight.id, "row": 1, "seat": 1}],
+        )
+
+        res = self.hold((1, 1))
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_booking_releases_own_holds(self):
+        self.hold((1, 1), (1, 2), (1, 3))
+
+        res = self.book((1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(self.flight.holds.exists())
+
+    def test_new_hold_replaces_previous_one(self):
+        self.hold((1, 1), (1, 2))
+
+        res = self.hold((1, 2), (1, 3))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            set(self.flight.holds.values_list("row", "seat")),
+            {(1, 2), (1, 3)},
+        )
+
+    def test_expired_holds_are_ignored_and_reclaimed(self):
+        self.hold_for_other_user((1, 1), seconds=-1)
+
+        res = self.client.get(FLIGHT_URL)
+        self.assertEqual(
+            res.data["results"][0]["seats_available"],
+            self.flight.airplane.capacity,
+        )
+
+        res = self.hold((1, 1))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(self.other_user.seat_holds.exists())
+
+    def test_sweep_seat_holds(self):
+        self.hold_for_other_user((1, 1), (1, 2), seconds=-1)
+        self.hold_for_other_user((1, 3))
+
+        out = StringIO()
+        call_command("sweep_seat_holds", stdout=out)
+
+        self.assertIn(
+            "Deleted 2 expired seat holds of 1 flights",
+            out.getvalue(),
+        )
+        self.assertEqual(
+            list(self.flight.holds.values_list("row", "seat")),
+            [(1, 3)],
+        )
+
+    def test_hold_seat_outside_airplane(self):
+        res = self.hold((100, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_hold_requires_authentication(self):
+        self.client.force_authenticate(None)
+
+        res = self.hold((1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,174 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.tests.tests_flight_api import (
+    FLIGHT_URL,
+    sample_flight_uk_portugal,
+)
+from airport.tests.tests_reference_api import COUNTRY_URL
+from user.authentication import user_key
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+TOKEN_REFRESH_URL = reverse("user:token_refresh")
+ME_URL = reverse("user:manage_user")
+ORDER_URL = reverse("airport:order-list")
+
+
+@override_settings(AIRPORT_STATELESS_JWT=True)
+class StatelessJWTApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@email.com",
+            password="1qazcde3",
+        )
+        self.admin = get_user_model().objects.create_user(
+            email="admin@email.com",
+            password="1qazcde3",
+            is_staff=True,
+        )
+
+    def authenticate(self, email):
+        res = self.client.post(
+            TOKEN_URL,
+            {"email": email, "password": "1qazcde3"},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.refresh = res.data["refresh"]
+        access = res.data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return AccessToken(access)
+
+    def refresh_access(self):
+        self.client.credentials()
+        res = self.client.post(TOKEN_REFRESH_URL, {"refresh": self.refresh})
+        if res.status_code == status.HTTP_200_OK:
+            self.client.credentials(
+                HTTP_AUTHORIZATION=f"Bearer {res.data['access']}"
+            )
+        return res
+
+    def get_user_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = getattr(self.client, method)(url, data, format="json")
+        user_queries = [
+            query["sql"]
+            for query in queries
+            if get_user_model()._meta.db_table in query["sql"]
+        ]
+        return res, user_queries
+
+    def test_access_token_has_staff_claim(self):
+        self.assertIs(self.authenticate("admin@email.com")["is_staff"], True)
+        self.assertIs(self.authenticate("test@email.com")["is_staff"], False)
+
+    def test_permissions_are_checked_from_claims(self):
+        sample_flight_uk_portugal()
+        self.authenticate("test@email.com")
+
+        res, user_queries = self.get_user_queries("get", FLIGHT_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(user_queries, [])
+
+        res, user_queries = self.get_user_queries(
+            "post", COUNTRY_URL, {"name": "Spain"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(user_queries, [])
+
+        self.authenticate("admin@email.com")
+        res, user_queries = self.get_user_queries(
+            "post", COUNTRY_URL, {"name": "Spain"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(user_queries, [])
+
+    def test_orders_belong_to_token_user(self):
+        flight = sample_flight_uk_portugal()
+        self.authenticate("test@email.com")
+
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "flight": flight.id}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.user.orders.count(), 1)
+
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_demoted_admin_loses_staff_claim_on_refresh(self):
+        self.authenticate("admin@email.com")
+        self.admin.is_staff = False
+        self.admin.save()
+
+        res = self.refresh_access()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIs(AccessToken(res.data["access"])["is_staff"], False)
+
+        res = self.client.post(COUNTRY_URL, {"name": "Spain"})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_deactivated_user_can_not_refresh(self):
+        self.authenticate("admin@email.com")
+        self.admin.is_active = False
+        self.admin.save()
+
+        res = self.refresh_access()
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_manage_user_reads_cached_user(self):
+        self.authenticate("test@email.com")
+
+        res, user_queries = self.get_user_queries("get", ME_URL)
+        self.assertEqual(res.data["email"], "test@email.com")
+        self.assertEqual(len(user_queries), 1)
+
+        res, user_queries = self.get_user_queries("get", ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(user_queries, [])
+
+    def test_password_hash_is_not_cached(self):
+        self.authenticate("test@email.com")
+        self.client.get(ME_URL)
+
+        cached = cache.get(user_key(self.user.pk))
+        self.assertEqual(cached["email"], "test@email.com")
+        self.assertNotIn("password", cached)
+
+    def test_update_loads_user_from_database(self):
+        self.authenticate("test@email.com")
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {"is_staff": True})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("1qazcde3"))
+
+    def test_updated_user_is_not_read_from_cache(self):
+        self.authenticate("test@email.com")
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {"email": "new@email.com"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data["email"], "new@email.com")
+
+    def test_deleted_user_is_rejected_by_manage_user(self):
+        self.authenticate("test@email.com")
+        self.user.delete()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
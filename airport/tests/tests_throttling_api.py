@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.tests.tests_flight_api import sample_flight_uk_portugal
+from airport.throttling import UserRateThrottle
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def throttle_rates(**rates) -> dict:
+    return {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            **settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"],
+            **rates,
+        },
+    }
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = SimpleNamespace(
+            user=get_user_model().objects.create_user(
+                email="test@email.com",
+                password="1qazcde3",
+            )
+        )
+
+    def allowed_requests(self, now: float) -> int:
+        throttle = UserRateThrottle()
+        throttle.timer = lambda: now
+        allowed = 0
+        while throttle.allow_request(self.request, None):
+            allowed += 1
+        return allowed
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(user="10/min"))
+    def test_previous_window_is_weighted_by_overlap(self):
+        self.assertEqual(self.allowed_requests(now=50), 10)
+        # 40s into the next window, the previous one still weighs 10 / 3.
+        self.assertEqual(self.allowed_requests(now=100), 7)
+        # Two windows later, it is forgotten.
+        self.assertEqual(self.allowed_requests(now=180), 10)
+
+
+class OrderThrottleApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@email.com",
+                password="1qazcde3",
+            )
+        )
+        self.flight = sample_flight_uk_portugal()
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(order_create="2/min"))
+    def test_order_creation_has_its_own_rate(self):
+        for seat in (1, 2):
+            res = self.client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {"row": 1, "seat": seat, "flight": self.flight.id}
+                    ]
+                },
+                format="json",
+            )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 3, "flight": self.flight.id}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
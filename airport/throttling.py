@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import throttling
+from rest_framework.settings import api_settings
+
+from airport.metrics import THROTTLED_REQUESTS
+
+
+class SlidingWindowThrottleMixin:
+    """
+    Sliding window counter in the AIRPORT_THROTTLE_CACHE_ALIAS cache,
+    in place of DRF's list of request timestamps.
+
+    Requests are counted in fixed windows as long as the rate's duration,
+    and the previous window's count is weighted by the part of it still
+    inside the sliding window. Whatever the rate, a client costs two
+    integers, and with a shared cache (ex. Redis) every worker process
+    enforces the same limit.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.AIRPORT_THROTTLE_CACHE_ALIAS]
+
+    @property
+    def THROTTLE_RATES(self):  # noqa: N802
+        # Read on every request, DRF reads them once at import.
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, elapsed = divmod(int(self.now), self.duration)
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+        counts = self.cache.get_many([current_key, previous_key])
+        self.current = counts.get(current_key, 0)
+        self.previous = counts.get(previous_key, 0)
+        self.elapsed = elapsed / self.duration
+
+        if (
+            self.previous * (1 - self.elapsed) + self.current
+            >= self.num_requests
+        ):
+            return self.throttle_failure()
+
+        # Kept for the next window, where it is the previous one.
+        self.cache.add(current_key, 0, 2 * self.duration)
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr().
+            self.cache.set(current_key, 1, 2 * self.duration)
+        return True
+
+    def throttle_failure(self):
+        THROTTLED_REQUESTS.inc(scope=self.scope)
+        return False
+
+    def wait(self):
+        """Seconds until the weighted count drops under the limit."""
+        if self.current >= self.num_requests:
+            # Next window, where this one weighs `current`.
+            return self.duration * (
+                1 - self.elapsed + 1 - self.num_requests / self.current
+            )
+        return self.duration * max(
+            0,
+            1 - (self.num_requests - self.current) / self.previous
+            - self.elapsed,
+        )
+
+
+class AnonRateThrottle(
+    SlidingWindowThrottleMixin,
+    throttling.AnonRateThrottle,
+):
+    pass
+
+
+class UserRateThrottle(
+    SlidingWindowThrottleMixin,
+    throttling.UserRateThrottle,
+):
+    pass
+
+
+class ScopedRateThrottle(
+    SlidingWindowThrottleMixin,
+    throttling.ScopedRateThrottle,
+):
+    """
+    Separate, usually lower, rate for expensive actions:
+    views name the rate of the current request in `throttle_scope`.
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
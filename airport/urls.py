@@ -9,6 +9,9 @@ from airport.views import (
     RouteViewSet,
     FlightViewSet,
     OrderViewSet,
+    ItineraryViewSet,
+    ExportViewSet,
+    MetricsViewSet,
 )
 
 from rest_framework import routers
@@ -26,6 +29,9 @@ router.register("airports", AirportViewSet)
 router.register("routes", RouteViewSet)
 router.register("flights", FlightViewSet)
 router.register("orders", OrderViewSet)
+router.register("itineraries", ItineraryViewSet, basename="itinerary")
+router.register("exports", ExportViewSet, basename="export")
+router.register("metrics", MetricsViewSet, basename="metrics")
 
 urlpatterns = [
     path("", include(router.urls)),
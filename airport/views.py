@@ -1,9 +1,18 @@
+import csv
+import datetime
+
 import rest_framework.permissions
-from django.db.models import Count, F
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import F, Max, Prefetch, Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
 from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import action as action_decorator
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from airport.models import (
@@ -16,6 +25,8 @@ from airport.models import (
     Location,
     Order,
     Route,
+    SeatHold,
+    Ticket,
 )
 
 from airport.serializers import (
@@ -29,23 +40,60 @@ from airport.serializers import (
     AirportSerializer,
     CountrySerializer,
     CrewSerializer,
+    FlightFlatListSerializer,
     FlightListSerializer,
     FlightRetrieveSerializer,
+    FlightScheduleResultSerializer,
+    FlightScheduleSerializer,
     FlightSerializer,
     LocationListSerializer,
     LocationRetrieveSerializer,
     LocationSerializer,
+    OrderExportSerializer,
     OrderSerializer,
     RouteListSerializer,
     RouteRetrieveSerializer,
     RouteSerializer,
     OrderListRetrieveSerializer,
+    SeatHoldSerializer,
+    SeatMapSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
 )
-
-
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+from airport.cache import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    get_generations,
+)
+from airport.exports import CONTENT_TYPES, export_lines, order_rows
+from airport.idempotency import HEADER, IdempotentCreateMixin
+from airport.instrumentation import registry
+from airport.metrics import (
+    FLIGHT_REQUEST_SECONDS,
+    registry as metrics_registry,
+)
+from airport.itineraries import get_route_graph
+from airport.pagination import (
+    CursorPaginationMixin,
+    FlightCursorPagination,
+    OrderCursorPagination,
+)
+from airport.replicas import ReplicaReadMixin, pin_to_primary
+from airport.scheduling import schedule_flights
+from airport.search import city_location_ids, get_city_match
+from airport.seat_map import SeatMap
+
+
+class AirplaneTypeViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
+    cache_models = (AirplaneType,)
+    etag_models = cache_models
 
     def get_queryset(self):
         queryset = self.queryset
@@ -69,9 +117,16 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Airplane.objects.all()
     serializer_class = AirplaneSerializer
+    cache_models = (Airplane, AirplaneType)
+    etag_models = cache_models
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -102,19 +157,33 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
 
 
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
+    cache_models = (Country,)
+    etag_models = cache_models
 
 
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Location.objects.all()
     serializer_class = LocationSerializer
+    cache_models = (Location, Country)
+    etag_models = cache_models
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -130,9 +199,16 @@ class LocationViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Airport.objects.all()
     serializer_class = AirportSerializer
+    cache_models = (Airport, Location, Country)
+    etag_models = cache_models
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -146,7 +222,12 @@ class AirportViewSet(viewsets.ModelViewSet):
 
         cities = self.request.query_params.get("city", None)
         if cities:
-            queryset = queryset.filter(location__city__icontains=cities)
+            queryset = queryset.filter(
+                location__in=city_location_ids(
+                    cities,
+                    get_city_match(self.request.query_params),
+                )
+            )
 
         if self.action in ("list", "retrieve"):
             queryset = queryset.select_related()
@@ -159,16 +240,30 @@ class AirportViewSet(viewsets.ModelViewSet):
                 "city",
                 type=str,
                 description="Filter airports by city name (ex. ?city=Berlin)",
-            )
+            ),
+            OpenApiParameter(
+                "city_match",
+                type=str,
+                enum=["contains", "exact", "prefix"],
+                description="How the city name is matched, "
+                            "contains by default (ex. ?city_match=prefix)",
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Route.objects.all()
     serializer_class = RouteSerializer
+    cache_models = (Route, Airport, Location, Country)
+    etag_models = cache_models
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -184,45 +279,204 @@ class RouteViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Flight.objects.all()
     serializer_class = FlightSerializer
+    cursor_pagination_class = FlightCursorPagination
+    etag_models = (
+        Flight,
+        Route,
+        Airplane,
+        AirplaneType,
+        Airport,
+        Location,
+        Country,
+        Crew,
+    )
+
+    @property
+    def throttle_scope(self):
+        return "seat_hold" if self.action == "holds" else None
+
+    @property
+    def flat_projection(self) -> bool:
+        return self.request.query_params.get("projection") == "flat"
+
+    def get_validators(self, request, *args, **kwargs):
+        # Seats of expired holds are released without any write, so the
+        # validators change with the expiry of the last expired hold.
+        if self.action != "retrieve":
+            etag, last_modified = super().get_validators(
+                request, *args, **kwargs
+            )
+            expired_at = SeatHold.objects.expired().aggregate(
+                expired_at=Max("expires_at")
+            )["expired_at"]
+            if expired_at is None:
+                return etag, last_modified
+            return (
+                # Appended inside the quotes of the weak ETag.
+                f'{etag[:-1]}-{expired_at.timestamp()}"',
+                max(last_modified, expired_at.timestamp()),
+            )
+
+        # A single flight changes with its own updated_at,
+        # other flights being booked does not invalidate it.
+        try:
+            updated_at, expired_at = (
+                Flight.objects
+                .filter(pk=kwargs["pk"])
+                .annotate(
+                    expired_at=Max(
+                        "holds__expires_at",
+                        filter=Q(holds__expires_at__lte=timezone.now()),
+                    )
+                )
+                .values_list("updated_at", "expired_at")
+                .first()
+            ) or (None, None)
+        except ValueError:
+            return None
+        if updated_at is None:
+            return None
+        updated_at = max(updated_at, expired_at or updated_at)
+        generations = get_generations(
+            model for model in self.etag_models if model is not Flight
+        )
+        return (
+            f'W/"flight-{kwargs["pk"]}-{updated_at.timestamp()}'
+            f'-{max(generations)}"',
+            max(updated_at.timestamp(), max(generations) / 10 ** 9),
+        )
+
+    @staticmethod
+    def _params_to_datetime(name: str, value: str) -> datetime.datetime:
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            try:
+                parsed_date = parse_date(value)
+            except ValueError:
+                parsed_date = None
+            if parsed_date is None:
+                raise ValidationError(
+                    {name: "Use the ISO 8601 format (ex. 2024-09-16T14:00)"}
+                )
+            parsed = datetime.datetime.combine(parsed_date, datetime.time())
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
 
     def get_serializer_class(self):
-        if self.action == "list":
+        if self.action == "list" and self.flat_projection:
+            return FlightFlatListSerializer
+        elif self.action == "list":
             return FlightListSerializer
         elif self.action == "retrieve":
             return FlightRetrieveSerializer
+        elif self.action == "seat_map":
+            return SeatMapSerializer
+        elif self.action == "holds":
+            return SeatHoldSerializer
+        elif self.action == "schedule":
+            return FlightScheduleSerializer
         return FlightSerializer
 
     def get_queryset(self):
         queryset = self.queryset
 
+        city_match = get_city_match(self.request.query_params)
+
         origin = self.request.query_params.get("origin", None)
         if origin:
             queryset = queryset.filter(
-                route__origin__location__city__icontains=origin
+                route__origin__location__in=city_location_ids(
+                    origin,
+                    city_match,
+                )
             )
 
         destination = self.request.query_params.get("destination", None)
         if destination:
             queryset = queryset.filter(
-                route__destination__location__city__icontains=destination
+                route__destination__location__in=city_location_ids(
+                    destination,
+                    city_match,
+                )
             )
 
-        if self.action == "list":
+        departure_after = self.request.query_params.get(
+            "departure_after", None
+        )
+        if departure_after:
+            queryset = queryset.filter(
+                departure_time__gte=self._params_to_datetime(
+                    "departure_after", departure_after
+                )
+            )
+
+        departure_before = self.request.query_params.get(
+            "departure_before", None
+        )
+        if departure_before:
+            queryset = queryset.filter(
+                departure_time__lt=self._params_to_datetime(
+                    "departure_before", departure_before
+                )
+            )
+
+        date = self.request.query_params.get("date", None)
+        if date:
+            # A range instead of `departure_time__date` keeps the index usable.
+            day_start = self._params_to_datetime("date", date)
+            queryset = queryset.filter(
+                departure_time__gte=day_start,
+                departure_time__lt=day_start + datetime.timedelta(days=1),
+            )
+
+        if self.action == "list" and self.flat_projection:
+            queryset = (
+                queryset
+                .order_by("departure_time", "id")
+                .values("id", "departure_time", "arrival_time")
+                .annotate(
+                    origin_city=F("route__origin__location__city"),
+                    destination_city=F("route__destination__location__city"),
+                    airplane_name=F("airplane__name"),
+                    airplane_type=F("airplane__airplane_type__name"),
+                    capacity=F("airplane__seats_in_row") * F("airplane__rows"),
+                    seats_available=F(
+                        "airplane__seats_in_row"
+                    ) * F("airplane__rows") - F("tickets_sold")
+                    - Flight.seats_held(),
+                )
+            )
+        elif self.action == "list":
             queryset = (
                 queryset
-                .select_related()
-                .prefetch_related("crew")
+                .select_related(
+                    "airplane__airplane_type",
+                    "route__origin__location__country",
+                    "route__destination__location__country",
+                )
                 .annotate(
                     seats_available=F(
                         "airplane__seats_in_row"
-                    ) * F("airplane__rows") - Count("tickets")
-                ).order_by("id")
+                    ) * F("airplane__rows") - F("tickets_sold")
+                    - Flight.seats_held()
+                ).order_by("departure_time", "id")
             )
         elif self.action == "retrieve":
             queryset = queryset.select_related().prefetch_related("crew")
+        elif self.action in ("seat_map", "holds"):
+            queryset = queryset.select_related("airplane")
 
         return queryset
 
@@ -241,13 +495,128 @@ class FlightViewSet(viewsets.ModelViewSet):
                             "city name (ex.: ?destination=New-York)",
 
             ),
+            OpenApiParameter(
+                "city_match",
+                type=str,
+                enum=["contains", "exact", "prefix"],
+                description="How origin and destination city names are "
+                            "matched, contains by default "
+                            "(ex.: ?city_match=exact)",
+            ),
+            OpenApiParameter(
+                "projection",
+                type=str,
+                enum=["flat"],
+                description="Return flat rows with city, airplane and "
+                            "seat columns instead of the nested strings "
+                            "(ex.: ?projection=flat)",
+            ),
+            OpenApiParameter(
+                "departure_after",
+                type=str,
+                description="Filter flights departing at or after "
+                            "the given time (ex.: "
+                            "?departure_after=2024-09-16T14:00)",
+            ),
+            OpenApiParameter(
+                "departure_before",
+                type=str,
+                description="Filter flights departing before "
+                            "the given time (ex.: "
+                            "?departure_before=2024-09-17)",
+            ),
+            OpenApiParameter(
+                "date",
+                type=str,
+                description="Filter flights departing on the given day "
+                            "(ex.: ?date=2024-09-16)",
+            ),
+            OpenApiParameter(
+                "pagination",
+                type=str,
+                enum=["cursor"],
+                description="Paginate by departure time with a cursor "
+                            "instead of limit/offset "
+                            "(ex.: ?pagination=cursor)",
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        with FLIGHT_REQUEST_SECONDS.time(action="list"):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with FLIGHT_REQUEST_SECONDS.time(action="retrieve"):
+            return super().retrieve(request, *args, **kwargs)
+
+    @action_decorator(
+        methods=["GET"],
+        detail=True,
+        url_path="seat-map",
+    )
+    def seat_map(self, request, pk=None):
+        flight = self.get_object()
+        serializer = self.get_serializer(SeatMap.for_flight(flight))
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action_decorator(
+        methods=["POST"],
+        detail=True,
+        permission_classes=[rest_framework.permissions.IsAuthenticated],
+    )
+    def holds(self, request, pk=None):
+        """
+        Hold seats for AIRPORT_SEAT_HOLD_SECONDS while checking out,
+        in place of the previous holds of the user on the flight.
+        """
+        flight = self.get_object()
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "flight": flight},
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user_id=request.user.pk)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class OrderViewSet(viewsets.GenericViewSet,
+    @extend_schema(
+        responses={
+            status.HTTP_200_OK: FlightScheduleResultSerializer,
+            status.HTTP_201_CREATED: FlightScheduleResultSerializer,
+            status.HTTP_400_BAD_REQUEST: FlightScheduleResultSerializer,
+        },
+    )
+    @action_decorator(methods=["POST"], detail=False)
+    def schedule(self, request):
+        """
+        Create many flights at once, ex. a season's timetable, from a list,
+        a weekly pattern or a CSV/JSON Lines file. Nothing is created when
+        a row has errors, they are returned by row instead.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dry_run = serializer.validated_data["dry_run"]
+        try:
+            result = schedule_flights(serializer.rows(), dry_run=dry_run)
+        except (UnicodeDecodeError, csv.Error) as error:
+            raise ValidationError(
+                {"upload": f"Cannot read the file: {error}"}
+            ) from error
+
+        if result.errors:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif dry_run:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(
+            FlightScheduleResultSerializer(result._asdict()).data,
+            status=response_status,
+        )
+
+
+class OrderViewSet(IdempotentCreateMixin,
+                   CursorPaginationMixin,
+                   viewsets.GenericViewSet,
                    mixins.ListModelMixin,
                    mixins.RetrieveModelMixin,
                    mixins.CreateModelMixin,
@@ -256,21 +625,195 @@ class OrderViewSet(viewsets.GenericViewSet,
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = (rest_framework.permissions.IsAuthenticated,)
+    cursor_pagination_class = OrderCursorPagination
+
+    @property
+    def throttle_scope(self):
+        # Booking locks seats and writes several tables.
+        return "order_create" if self.action == "create" else None
 
     def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user_id=self.request.user.pk)
 
         if self.action in ("list", "retrieve"):
             queryset = queryset.prefetch_related(
-                "tickets__flight__route__origin__location__country",
-                "tickets__flight__route__destination__location__country",
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.select_related(
+                        "flight__route__origin__location__country",
+                        "flight__route__destination__location__country",
+                    ),
+                )
             )
         return queryset
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                HEADER,
+                type=str,
+                location=OpenApiParameter.HEADER,
+                description="Unique key of the order, ex. a UUID: retries "
+                            "with the same key and body get the response "
+                            "of the first request instead of a new order",
+            ),
+        ]
+    )
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.pk)
+        # Let the user see the booked seats before the replicas do.
+        pin_to_primary(self.request.user)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            flight_ids = list(
+                instance.tickets.values_list("flight_id", flat=True)
+            )
+            instance.delete()
+            Flight.update_tickets_sold(flight_ids, sign=-1)
+        pin_to_primary(self.request.user)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
             return OrderListRetrieveSerializer
         return OrderSerializer
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "pagination",
+                type=str,
+                enum=["cursor"],
+                description="Paginate by creation time with a cursor "
+                            "instead of limit/offset "
+                            "(ex.: ?pagination=cursor)",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class ItineraryViewSet(ReplicaReadMixin, viewsets.GenericViewSet):
+    serializer_class = ItinerarySerializer
+    pagination_class = None
+    throttle_scope = "itinerary_search"
+
+    @extend_schema(
+        parameters=[ItinerarySearchSerializer],
+        responses=ItinerarySerializer(many=True),
+    )
+    def list(self, request, *args, **kwargs):
+        """
+        Search direct and connecting flights between two cities
+        (ex.: ?origin=Berlin&destination=Lisbon&date=2024-09-16).
+        """
+        search = ItinerarySearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        params = search.validated_data
+
+        city_match = get_city_match(request.query_params)
+        origin_ids = set(
+            Airport.objects.filter(
+                location__in=city_location_ids(params["origin"], city_match)
+            ).values_list("id", flat=True)
+        )
+        destination_ids = set(
+            Airport.objects.filter(
+                location__in=city_location_ids(
+                    params["destination"],
+                    city_match,
+                )
+            ).values_list("id", flat=True)
+        )
+
+        itineraries = get_route_graph().search(
+            origin_ids=origin_ids,
+            destination_ids=destination_ids,
+            day_start=timezone.make_aware(
+                datetime.datetime.combine(params["date"], datetime.time())
+            ),
+            max_legs=params["max_legs"],
+            min_connection=datetime.timedelta(
+                minutes=params["min_connection"]
+            ),
+            max_connection=datetime.timedelta(
+                minutes=params["max_connection"]
+            ),
+            limit=params["limit"],
+        )
+        serializer = self.get_serializer(itineraries, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ExportViewSet(ReplicaReadMixin, viewsets.ViewSet):
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(
+        parameters=[OrderExportSerializer],
+        responses={
+            (200, CONTENT_TYPES["csv"]): str,
+            (200, CONTENT_TYPES["jsonl"]): str,
+        },
+    )
+    @action_decorator(methods=["GET"], detail=False)
+    def orders(self, request, *args, **kwargs):
+        """
+        Stream orders with their tickets, one line per ticket, as CSV or
+        JSON Lines (ex.: ?created_after=2024-09-01&file_format=jsonl).
+        """
+        export = OrderExportSerializer(data=request.query_params)
+        export.is_valid(raise_exception=True)
+        params = export.validated_data
+
+        # Rows are read while streaming, after the replica routing of
+        # the request is over, so pick the database now.
+        rows = order_rows(
+            Order.objects.using(router.db_for_read(Order)),
+            created_after=params.get("created_after"),
+            created_before=params.get("created_before"),
+            chunk_size=settings.AIRPORT_EXPORT_CHUNK_SIZE,
+        )
+        response = StreamingHttpResponse(
+            export_lines(
+                rows,
+                params["file_format"],
+                settings.AIRPORT_EXPORT_CHUNK_SIZE,
+            ),
+            content_type=CONTENT_TYPES[params["file_format"]],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="orders.{params["file_format"]}"'
+        )
+        # Sent to the client as it is written, not buffered by nginx.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class MetricsViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminUser,)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Per-view request histograms of this process
+        (see AIRPORT_INSTRUMENTATION).
+        """
+        return Response(
+            {
+                "enabled": settings.AIRPORT_INSTRUMENTATION,
+                "views": registry.as_dict(),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @extend_schema(responses={(200, "text/plain"): str})
+    @action_decorator(methods=["GET"], detail=False)
+    def prometheus(self, request, *args, **kwargs):
+        """Counters and histograms in the Prometheus text format."""
+        return HttpResponse(
+            metrics_registry.exposition(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
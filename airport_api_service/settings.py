@@ -37,6 +37,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "airport.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -79,9 +80,148 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        # Keep connections open between requests, checked before reuse.
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# psycopg connection pool shared by the threads of a process. Connections go
+# back to the pool after every request, so they can not be persistent too.
+
+if os.getenv("DB_POOL", "false").lower() == "true":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        }
+    }
+
+# Read replicas of the default database, ex. POSTGRES_REPLICA_HOSTS=db2,db3.
+# Safe requests to flights, routes, airports and other reference data read
+# from them, users who just booked read from the primary for
+# AIRPORT_READ_YOUR_WRITES_SECONDS. Cached responses and ETags of rows
+# written during the last AIRPORT_READ_YOUR_WRITES_SECONDS are built
+# from the primary too, so replica lag is not cached under a new
+# generation.
+
+DATABASE_REPLICAS = []
+
+for index, host in enumerate(
+    filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(","))
+):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+DATABASE_ROUTERS = ["airport.replicas.ReplicaRouter"]
+
+AIRPORT_READ_YOUR_WRITES_SECONDS = int(
+    os.getenv("AIRPORT_READ_YOUR_WRITES_SECONDS", 10)
+)
+
+AIRPORT_REPLICA_RETRY_SECONDS = int(
+    os.getenv("AIRPORT_REPLICA_RETRY_SECONDS", 30)
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# LocMem is per process, use a shared backend (ex. Redis) in production.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+AIRPORT_CACHE_ALIAS = "default"
+
+# Throttle counters, shared by all worker processes when the backend is
+# (ex. THROTTLE_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache).
+# The default LocMem cache of the same LOCATION shares the default store.
+
+CACHES["throttle"] = {
+    "BACKEND": os.getenv(
+        "THROTTLE_CACHE_BACKEND",
+        CACHES["default"]["BACKEND"],
+    ),
+    "LOCATION": os.getenv(
+        "THROTTLE_CACHE_LOCATION",
+        CACHES["default"]["LOCATION"],
+    ),
+}
+
+AIRPORT_THROTTLE_CACHE_ALIAS = "throttle"
+
+AIRPORT_CACHE_TIMEOUT = int(os.getenv("AIRPORT_CACHE_TIMEOUT", 300))
+
+# Seconds seats stay held for a user checking out (POST
+# /api/airports/flights/<id>/holds/). Expired holds are deleted lazily,
+# run sweep_seat_holds periodically to delete the others.
+
+AIRPORT_SEAT_HOLD_SECONDS = int(os.getenv("AIRPORT_SEAT_HOLD_SECONDS", 600))
+
+# Seconds an Idempotency-Key of POST /api/airports/orders/ replays the
+# first response. Expired keys are deleted lazily per user, run
+# purge_idempotency_keys periodically to delete the others.
+
+AIRPORT_IDEMPOTENCY_KEY_SECONDS = int(
+    os.getenv("AIRPORT_IDEMPOTENCY_KEY_SECONDS", 24 * 60 * 60)
+)
+
+# Rows read from the database and written to the response at a time by
+# the streaming exports of /api/airports/exports/.
+
+AIRPORT_EXPORT_CHUNK_SIZE = int(os.getenv("AIRPORT_EXPORT_CHUNK_SIZE", 2000))
+
+
+# Per-request query count and timings: Server-Timing header, JSON log lines
+# and histograms at /api/airports/metrics/.
+
+AIRPORT_INSTRUMENTATION = (
+    os.getenv("AIRPORT_INSTRUMENTATION", "false").lower() == "true"
+)
+
+# Prometheus metrics at /api/airports/metrics/prometheus/. With several
+# worker processes, set AIRPORT_METRICS_DIR to a directory shared by them.
+
+AIRPORT_METRICS_DIR = os.getenv("AIRPORT_METRICS_DIR")
+
+AIRPORT_METRICS_FLUSH_INTERVAL = float(
+    os.getenv("AIRPORT_METRICS_FLUSH_INTERVAL", 1)
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "requests": {
+            "class": "logging.StreamHandler",
+            "formatter": "message",
+        },
+    },
+    "loggers": {
+        "airport.requests": {
+            "handlers": ["requests"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 
 AUTH_USER_MODEL = "user.User"
 
@@ -108,6 +248,47 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing: PASSWORD_HASHER (argon2, scrypt or pbkdf2) hashes new
+# passwords, the others still check older hashes. A password hashed with
+# another hasher or other parameters is hashed again on the next login.
+# Hashing runs on PASSWORD_HASHING_THREADS threads per process.
+# Argon2id defaults to the OWASP minimum (19 MiB, 2 iterations),
+# about ten times faster than PBKDF2 with Django's iterations.
+
+PASSWORD_HASHER_CLASSES = {
+    "argon2": "user.hashers.Argon2PasswordHasher",
+    "scrypt": "user.hashers.ScryptPasswordHasher",
+    "pbkdf2": "user.hashers.PBKDF2PasswordHasher",
+}
+
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "argon2")
+
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CLASSES[PASSWORD_HASHER],
+    *(
+        hasher
+        for name, hasher in PASSWORD_HASHER_CLASSES.items()
+        if name != PASSWORD_HASHER
+    ),
+    "user.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+PASSWORD_HASHING_THREADS = int(
+    os.getenv("PASSWORD_HASHING_THREADS", os.cpu_count() or 1)
+)
+
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", 2))
+PASSWORD_ARGON2_MEMORY_COST = int(  # KiB
+    os.getenv("PASSWORD_ARGON2_MEMORY_COST", 19456)
+)
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", 1))
+
+PASSWORD_SCRYPT_WORK_FACTOR = int(
+    os.getenv("PASSWORD_SCRYPT_WORK_FACTOR", 2**14)
+)
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.getenv("PASSWORD_SCRYPT_BLOCK_SIZE", 8))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv("PASSWORD_SCRYPT_PARALLELISM", 5))
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
@@ -127,7 +308,7 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
-STATIC_URL = "static/"
+STATIC_URL = "/static/"
 
 MEDIA_ROOT = "/files/media/"
 
@@ -143,7 +324,7 @@ REST_FRAMEWORK = {
         "airport.permissions.IsAdminAllORIsAuthenticatedReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.JWTAuthentication",
     ],
 
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination"
@@ -152,12 +333,19 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle"
+        "airport.throttling.AnonRateThrottle",
+        "airport.throttling.UserRateThrottle",
+        "airport.throttling.ScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
-        "anon": "100/day",
-        "user": "1000/day"
+        "anon": os.getenv("THROTTLE_RATE_ANON", "100/day"),
+        "user": os.getenv("THROTTLE_RATE_USER", "1000/day"),
+        "order_create": os.getenv("THROTTLE_RATE_ORDER_CREATE", "10/min"),
+        "itinerary_search": os.getenv(
+            "THROTTLE_RATE_ITINERARY_SEARCH",
+            "60/min",
+        ),
+        "seat_hold": os.getenv("THROTTLE_RATE_SEAT_HOLD", "30/min"),
     }
 }
 
@@ -165,8 +353,33 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=120),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": "user.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.TokenRefreshSerializer",
 }
 
+# Authenticate from the claims of the access token (user id, is_staff)
+# without loading the user on every request. Token refreshes reload the
+# user, so a change of is_staff applies to access tokens obtained or
+# refreshed after it and a deactivated or deleted user can not refresh;
+# they keep access until their access token expires, so access tokens
+# then live AIRPORT_STATELESS_ACCESS_TOKEN_MINUTES instead of
+# ACCESS_TOKEN_LIFETIME.
+# Views needing the whole user load it through a cache of its
+# non-secret fields kept for AIRPORT_USER_CACHE_SECONDS.
+
+AIRPORT_STATELESS_JWT = (
+    os.getenv("AIRPORT_STATELESS_JWT", "false").lower() == "true"
+)
+
+if AIRPORT_STATELESS_JWT:
+    SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"] = timedelta(
+        minutes=int(os.getenv("AIRPORT_STATELESS_ACCESS_TOKEN_MINUTES", 5))
+    )
+
+AIRPORT_USER_CACHE_SECONDS = int(
+    os.getenv("AIRPORT_USER_CACHE_SECONDS", 60)
+)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Airport API",
     "DESCRIPTION": "Order tickets for your airplane trip",
@@ -0,0 +1,51 @@
+"""
+Production settings: the development settings with DEBUG off, without
+django-debug-toolbar and with JSON-only responses. Select them with
+DJANGO_SETTINGS_MODULE=airport_api_service.settings_production.
+"""
+import os
+
+from airport_api_service.settings import *  # noqa: F403
+from airport_api_service.settings import (
+    CACHES,
+    INSTALLED_APPS,
+    MIDDLEWARE,
+    REST_FRAMEWORK,
+)
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.getenv("ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if not middleware.startswith("debug_toolbar.")
+]
+
+STATIC_ROOT = os.getenv("STATIC_ROOT", "/files/static/")
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    # The browsable API renders HTML forms on every response.
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+    ],
+}
+
+# Without a shared cache (ex. Redis), the worker processes of a host
+# still share throttle counters through files.
+if CACHES["throttle"]["BACKEND"].endswith(".LocMemCache"):
+    CACHES = {
+        **CACHES,
+        "throttle": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": "/tmp/airport_throttle",
+        },
+    }
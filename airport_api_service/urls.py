@@ -1,4 +1,3 @@
-from debug_toolbar.toolbar import debug_toolbar_urls
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
@@ -27,4 +26,9 @@ urlpatterns = [
 ] + static(
     settings.MEDIA_URL,
     document_root=settings.MEDIA_ROOT
-) + debug_toolbar_urls()
+)
+
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    from debug_toolbar.toolbar import debug_toolbar_urls
+
+    urlpatterns += debug_toolbar_urls()
@@ -0,0 +1,47 @@
+"""
+Gunicorn settings of the production server, ex.:
+
+    gunicorn --config gunicorn.conf.py
+
+SERVER_INTERFACE=wsgi (default) runs airport_api_service.wsgi in threaded
+workers, SERVER_INTERFACE=asgi runs airport_api_service.asgi in uvicorn
+workers. The views are synchronous, so WSGI with threads is the faster one.
+"""
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv("SERVER_BIND", "0.0.0.0:8000")
+workers = int(
+    os.getenv("SERVER_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+threads = int(os.getenv("SERVER_THREADS", 4))
+timeout = int(os.getenv("SERVER_TIMEOUT", 30))
+graceful_timeout = timeout
+keepalive = 5
+# Restart workers now and then to bound memory growth.
+max_requests = int(os.getenv("SERVER_MAX_REQUESTS", 10_000))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+
+if os.getenv("SERVER_INTERFACE", "wsgi") == "asgi":
+    wsgi_app = "airport_api_service.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "airport_api_service.wsgi:application"
+    worker_class = "gthread"
+
+
+def on_starting(server):
+    # Metrics files of the previous run belong to processes that are gone.
+    metrics_dir = os.getenv("AIRPORT_METRICS_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def post_worker_init(worker):
+    # Fill the connection pool before the worker takes requests.
+    if os.getenv("DB_POOL", "false").lower() == "true":
+        from django.core.management import call_command
+
+        call_command("wait_for_db", warm_pool=True)
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.models import TokenUser
+
+from airport.cache import get_cache
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    With AIRPORT_STATELESS_JWT, requests are authenticated from the access
+    token alone: request.user is a TokenUser whose `id` and `is_staff` come
+    from its claims, and no query loads the user. Views needing the User row
+    get it from get_full_user().
+    """
+
+    def get_user(self, validated_token):
+        if settings.AIRPORT_STATELESS_JWT:
+            return authentication.JWTStatelessUserAuthentication.get_user(
+                self,
+                validated_token,
+            )
+        return super().get_user(validated_token)
+
+
+# Fields of the user kept in the cache, never the password hash:
+# the cache may be shared with other services.
+CACHED_FIELDS = ("id", "email", "is_staff", "is_active")
+
+
+def user_key(pk) -> str:
+    return f"user:user:{pk}"
+
+
+def get_full_user(user, for_update: bool = False):
+    """
+    Return the User of a TokenUser. Its CACHED_FIELDS are cached for
+    AIRPORT_USER_CACHE_SECONDS and a cache hit returns a User with only
+    these fields, which must not be saved: pass `for_update` to load the
+    whole row. Other users are returned as they are.
+    """
+    if not isinstance(user, TokenUser):
+        return user
+
+    cache = get_cache()
+    if not for_update:
+        fields = cache.get(user_key(user.pk))
+        if fields is not None:
+            return get_user_model()(**fields)
+
+    instance = get_user_model().objects.filter(pk=user.pk).first()
+    if instance is None or not instance.is_active:
+        raise exceptions.AuthenticationFailed(
+            _("User not found"),
+            code="user_not_found",
+        )
+    cache.set(
+        user_key(user.pk),
+        {field: getattr(instance, field) for field in CACHED_FIELDS},
+        settings.AIRPORT_USER_CACHE_SECONDS,
+    )
+    return instance
+
+
+def forget_user(sender, instance, **kwargs) -> None:
+    """Drop the cached row of a saved or deleted user."""
+    get_cache().delete(user_key(instance.pk))
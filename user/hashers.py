@@ -0,0 +1,94 @@
+"""
+Password hashers of PASSWORD_HASHERS, tuned from settings and run on
+a pool of PASSWORD_HASHING_THREADS threads per process.
+
+Hashing is CPU bound and slow on purpose: a burst of registrations or
+logins served by every thread of a worker would leave no CPU to the
+other requests. With the pool, at most PASSWORD_HASHING_THREADS hashes
+run at once, the other requests hashing a password wait for their turn.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+THREAD_NAME_PREFIX = "password-hashing"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_THREADS,
+                thread_name_prefix=THREAD_NAME_PREFIX,
+            )
+        return _executor
+
+
+def run_in_pool(function, *args, **kwargs):
+    if threading.current_thread().name.startswith(THREAD_NAME_PREFIX):
+        # Ex. verify() calling encode(), waiting for a free thread
+        # from a pool thread could wait forever.
+        return function(*args, **kwargs)
+    return get_executor().submit(function, *args, **kwargs).result()
+
+
+class PooledHasherMixin:
+    def encode(self, password, salt, *args, **kwargs):
+        return run_in_pool(super().encode, password, salt, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return run_in_pool(super().verify, password, encoded)
+
+    def harden_runtime(self, password, encoded):
+        return run_in_pool(super().harden_runtime, password, encoded)
+
+
+class Argon2PasswordHasher(PooledHasherMixin, hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class ScryptPasswordHasher(PooledHasherMixin, hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # OpenSSL refuses more than 32 MiB by default, scrypt
+        # needs 128 * work_factor * block_size bytes.
+        return 2 * 128 * self.work_factor * self.block_size
+
+
+class PBKDF2PasswordHasher(PooledHasherMixin, hashers.PBKDF2PasswordHasher):
+    """Django's default hasher, kept to check (and upgrade) older hashes."""
+
+
+class PBKDF2SHA1PasswordHasher(
+    PooledHasherMixin,
+    hashers.PBKDF2SHA1PasswordHasher,
+):
+    pass
@@ -2,7 +2,9 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
 
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -77,3 +79,36 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        """Add the claims read by stateless authentication,
+        copied to the access tokens of the refresh token and stamped
+        again by TokenRefreshSerializer."""
+        token = super().get_token(user)
+        token["is_staff"] = user.is_staff
+        return token
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Reload the user of the refresh token: inactive or deleted users get
+    no new access token, and the claims of TokenObtainPairSerializer
+    are stamped again, so a demoted admin loses is_staff at the next
+    refresh instead of when the refresh token expires.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise exceptions.AuthenticationFailed(
+                _("No active account found with the given credentials"),
+                code="no_active_account",
+            )
+        refresh["is_staff"] = user.is_staff
+        return super().validate({**attrs, "refresh": str(refresh)})
@@ -1,9 +1,13 @@
 from rest_framework import generics
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.settings import api_settings
+from rest_framework_simplejwt.views import TokenObtainPairView
 
+from airport.metrics import TOKEN_ISSUE_SECONDS, TOKENS_ISSUED
+
+from user.authentication import get_full_user
 from user.serializers import UserSerializer, AuthTokenSerializer
 
 
@@ -17,9 +21,24 @@ class LoginUserView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
 
 
+class MeteredTokenObtainPairView(TokenObtainPairView):
+    def post(self, request, *args, **kwargs):
+        with TOKEN_ISSUE_SECONDS.time():
+            try:
+                response = super().post(request, *args, **kwargs)
+            except Exception:
+                TOKENS_ISSUED.inc(outcome="rejected")
+                raise
+        TOKENS_ISSUED.inc(outcome="issued")
+        return response
+
+
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        return get_full_user(
+            self.request.user,
+            for_update=self.request.method not in SAFE_METHODS,
+        )